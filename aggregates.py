@@ -0,0 +1,142 @@
+"""Bucketed statistics for /api/aggregate.
+
+Buckets are aligned to multiples of the bucket width since the epoch (UTC),
+so the first and last may cover only part of [from, to). avg/min/max are
+computed in SQL from the coarsest rollup tables whose width divides the
+bucket (see rollups.segments()), with only the sub-minute edges grouped
+from sensor_readings over its timestamp index. p95 needs the individual
+values, so it is always computed from the raw rows of the range, read
+over the timestamp index a batch at a time and ranked per bucket with
+NumPy (nearest-rank method). Only numeric values count, as in the rollups.
+"""
+import re
+
+import numpy as np
+
+import rollups
+
+AGGREGATE_FUNCTIONS = ('avg', 'min', 'max', 'p95')
+
+# Keys used by /update and the dashboard -> sensor_readings column
+METRIC_ALIASES = {'temp': 'temperature', 'gasValue': 'gas_value'}
+
+# Raw rows read per batch when ranking p95
+P95_BATCH_ROWS = 65536
+
+# Upper bound on buckets per request, so a tiny bucket over a long range is refused instead of built
+MAX_AGGREGATE_BUCKETS = 10000
+
+_BUCKET_UNITS = {'s': 1000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000}
+
+
+def parse_bucket(value):
+    """Bucket width in ms from '30s', '5m', '1h', '1d' or plain seconds; None if invalid."""
+    match = re.fullmatch(r'(\d+)([smhd]?)', (value or '').strip())
+    if not match or int(match.group(1)) == 0:
+        return None
+    return int(match.group(1)) * _BUCKET_UNITS[match.group(2) or 's']
+
+
+def metric_column(metric):
+    """sensor_readings column for a metric name or alias; None if unknown."""
+    metric = METRIC_ALIASES.get(metric, metric)
+    return metric if metric in rollups.METRICS else None
+
+
+def _numeric(metric):
+    return f"CASE WHEN typeof({metric}) IN ('integer', 'real') THEN {metric} END"
+
+
+def _merged(conn, metric, bucket_ms, from_ms, to_ms, use_rollups):
+    """bucket start -> [count, min, max, sum], plus the number of segments read from each source."""
+    levels = [(suffix, width) for suffix, width in rollups.ROLLUPS if use_rollups and bucket_ms % width == 0]
+    buckets = {}
+    sources = {}
+    for suffix, start, end in rollups.segments(from_ms, to_ms, levels):
+        if suffix is None:
+            source = 'sensor_readings'
+            sql = f'''SELECT timestamp - timestamp % ? AS b, COUNT(v), MIN(v), MAX(v), TOTAL(v)
+                      FROM (SELECT timestamp, {_numeric(metric)} AS v FROM sensor_readings
+                            WHERE timestamp >= ? AND timestamp < ?)
+                      GROUP BY b'''
+        else:
+            source = rollups.table(suffix)
+            sql = f'''SELECT bucket - bucket % ? AS b, SUM({metric}_count), MIN({metric}_min),
+                             MAX({metric}_max), TOTAL({metric}_sum)
+                      FROM {source} WHERE bucket >= ? AND bucket < ?
+                      GROUP BY b'''
+        sources[source] = sources.get(source, 0) + 1
+        for b, count, low, high, total in conn.execute(sql, (bucket_ms, start, end)):
+            acc = buckets.get(b)
+            if acc is None:
+                buckets[b] = [count, low, high, total]
+                continue
+            acc[0] += count
+            if low is not None and (acc[1] is None or low < acc[1]):
+                acc[1] = low
+            if high is not None and (acc[2] is None or high > acc[2]):
+                acc[2] = high
+            acc[3] += total
+    return buckets, sources
+
+
+def _nearest_rank(buckets, values):
+    """(bucket starts, p95 values, counts) for the rows of complete buckets."""
+    order = np.lexsort((values, buckets))
+    buckets, values = buckets[order], values[order]
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    counts = np.diff(np.r_[starts, len(buckets)])
+    # Nearest rank: the ceil(0.95 * n)-th smallest value of each bucket
+    picked = starts + (95 * counts + 99) // 100 - 1
+    return buckets[picked].astype(np.int64).tolist(), values[picked].tolist(), counts.tolist()
+
+
+def _p95(conn, metric, bucket_ms, from_ms, to_ms):
+    # Rows come back in timestamp order straight from the index, so every bucket but the
+    # last one of a batch is complete and can be ranked before the next batch is read
+    cursor = conn.execute(f'''SELECT timestamp - timestamp % ?, {metric} FROM sensor_readings
+                              WHERE timestamp >= ? AND timestamp < ? AND typeof({metric}) IN ('integer', 'real')
+                              ORDER BY timestamp''', (bucket_ms, from_ms, to_ms))
+    timestamps, values, counts = [], [], []
+    pending = np.empty((0, 2))
+    try:
+        while True:
+            rows = cursor.fetchmany(P95_BATCH_ROWS)
+            if rows:
+                pending = np.concatenate((pending, np.array(rows, dtype=float)))
+                done = np.searchsorted(pending[:, 0], pending[-1, 0])
+            else:
+                done = len(pending)
+            if done:
+                result = _nearest_rank(pending[:done, 0], pending[:done, 1])
+                timestamps += result[0]
+                values += result[1]
+                counts += result[2]
+                pending = pending[done:]
+            if not rows:
+                return timestamps, values, counts
+    finally:
+        cursor.close()
+
+
+def aggregate(conn, metric, bucket_ms, from_ms, to_ms, fn, use_rollups=True):
+    """Columnar result: bucket start timestamps, the fn value and the value count per bucket.
+
+    Buckets without a numeric value are left out. `metric` must be a
+    sensor_readings column (see metric_column()).
+    """
+    if fn == 'p95':
+        timestamps, values, counts = _p95(conn, metric, bucket_ms, from_ms, to_ms)
+        sources = {'sensor_readings': 1}
+    else:
+        buckets, sources = _merged(conn, metric, bucket_ms, from_ms, to_ms, use_rollups)
+        timestamps, values, counts = [], [], []
+        for b in sorted(buckets):
+            count, low, high, total = buckets[b]
+            if not count:
+                continue
+            timestamps.append(b)
+            values.append(total / count if fn == 'avg' else low if fn == 'min' else high)
+            counts.append(count)
+    return {"metric": metric, "fn": fn, "bucket_ms": bucket_ms, "from": from_ms, "to": to_ms,
+            "timestamps": timestamps, "values": values, "counts": counts, "source": sources}
@@ -0,0 +1,81 @@
+"""Content-hashed static assets for the dashboard pages.
+
+The CSS and JavaScript of every page live in assets/. build() writes each
+file to static/ as <name>.<hash>.<ext>, next to precompressed .gz and (when
+the optional brotli package is installed) .br variants, and returns the
+name -> hashed name manifest. Pages link the hashed names, so browsers can
+cache them forever: an edit produces a new name. Files already built for
+the current contents are not rewritten. Run this module to build ahead of
+time:
+
+    python assets.py
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(BASE_DIR, 'assets')
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+# One year; hashed names never change content
+MAX_AGE = 365 * 24 * 3600
+
+# Content-Encoding and file suffix of each precompressed variant, in server preference order
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def hashed_name(name, content):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def _write_atomic(path, data):
+    # Several workers may build at once; readers only ever see complete files
+    fd, staging = tempfile.mkstemp(prefix='.asset-', dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(staging, path)
+
+
+def _variants(content):
+    yield '', lambda: content
+    yield '.gz', lambda: gzip.compress(content, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda: brotli.compress(content, quality=11)
+
+
+def build(source_dir=SOURCE_DIR, static_dir=STATIC_DIR):
+    """Write hashed (and precompressed) copies of every source asset; returns the manifest."""
+    os.makedirs(static_dir, exist_ok=True)
+    manifest = {}
+    for name in sorted(os.listdir(source_dir)):
+        with open(os.path.join(source_dir, name), 'rb') as f:
+            content = f.read()
+        target = hashed_name(name, content)
+        manifest[name] = target
+        for suffix, encode in _variants(content):
+            path = os.path.join(static_dir, target + suffix)
+            if not os.path.exists(path):
+                _write_atomic(path, encode())
+    return manifest
+
+
+def negotiate(filename, accept_encodings, static_dir=STATIC_DIR):
+    """(path, Content-Encoding or None) of the best built variant the client accepts."""
+    path = os.path.join(static_dir, filename)
+    for encoding, suffix in ENCODINGS:
+        if accept_encodings[encoding] and os.path.exists(path + suffix):
+            return path + suffix, encoding
+    return path, None
+
+
+if __name__ == '__main__':
+    for source, target in build().items():
+        print(f"{source} -> static/{target}")
@@ -0,0 +1,145 @@
+let predictionHistory = [];
+const maxHistoryLength = 50;
+
+async function fetchFireStatus() {
+    try {
+        const response = await fetch('/fire-status');
+        const data = await response.json();
+
+        updatePredictionDisplay(data);
+        addToHistory(data);
+        updateLastUpdateTime();
+
+    } catch (error) {
+        console.error('Error fetching fire status:', error);
+        showError();
+    }
+}
+
+function updatePredictionDisplay(data) {
+    const statusCard = document.getElementById('statusCard');
+    const tempValue = document.getElementById('tempValue');
+    const smokeValue = document.getElementById('smokeValue');
+    const gasValue = document.getElementById('gasValue');
+    const confidenceValue = document.getElementById('confidenceValue');
+    const aiIcon = document.getElementById('aiIcon');
+    const aiStatus = document.getElementById('aiStatus');
+
+    // Update sensor values
+    tempValue.textContent = `${data.temperature.toFixed(1)}°C`;
+    smokeValue.textContent = `${data.smoke.toFixed(1)} ppm`;
+    gasValue.textContent = data.gas.toString();
+    confidenceValue.textContent = `${(data.confidence * 100).toFixed(1)}%`;
+
+    // Update AI status
+    if (data.ai_powered) {
+        aiIcon.className = 'fas fa-robot text-green-400';
+        aiStatus.textContent = 'Bomma AI Active';
+    } else {
+        aiIcon.className = 'fas fa-cog text-yellow-400';
+        aiStatus.textContent = 'Threshold-based';
+    }
+
+    // Update prediction status
+    if (data.prediction === 'Fire Detected') {
+        statusCard.className = 'inline-block px-8 py-4 rounded-xl font-bold text-2xl transition-all duration-500 fire-danger text-white shadow-2xl';
+        statusCard.innerHTML = '<i class="fas fa-fire mr-2"></i>🔥 FIRE DETECTED!';
+    } else {
+        statusCard.className = 'inline-block px-8 py-4 rounded-xl font-bold text-2xl transition-all duration-500 bg-green-600 text-white shadow-2xl';
+        statusCard.innerHTML = '<i class="fas fa-shield-alt mr-2"></i>✅ NO FIRE DETECTED';
+    }
+}
+
+function addToHistory(data) {
+    const historyItem = {
+        timestamp: new Date(data.timestamp).toLocaleString(),
+        temperature: data.temperature.toFixed(1),
+        smoke: data.smoke.toFixed(1),
+        gas: data.gas,
+        prediction: data.prediction,
+        confidence: (data.confidence * 100).toFixed(1)
+    };
+
+    predictionHistory.unshift(historyItem);
+
+    if (predictionHistory.length > maxHistoryLength) {
+        predictionHistory = predictionHistory.slice(0, maxHistoryLength);
+    }
+
+    updateHistoryTable();
+}
+
+function updateHistoryTable() {
+    const historyTable = document.getElementById('historyTable');
+    const noHistory = document.getElementById('noHistory');
+
+    if (predictionHistory.length === 0) {
+        noHistory.style.display = 'block';
+        return;
+    }
+
+    noHistory.style.display = 'none';
+
+    historyTable.innerHTML = predictionHistory.map(item => `
+        <tr class="border-b border-gray-700 hover:bg-gray-800 transition-colors duration-200">
+            <td class="py-3 text-sm">${item.timestamp}</td>
+            <td class="py-3 text-orange-400 font-semibold">${item.temperature}°C</td>
+            <td class="py-3 text-gray-300">${item.smoke} ppm</td>
+            <td class="py-3 text-purple-400">${item.gas}</td>
+            <td class="py-3">
+                <span class="px-3 py-1 rounded-full text-sm font-semibold ${
+                    item.prediction === 'Fire Detected' 
+                        ? 'bg-red-600 text-white' 
+                        : 'bg-green-600 text-white'
+                }">
+                    ${item.prediction}
+                </span>
+            </td>
+            <td class="py-3 text-blue-400 font-semibold">${item.confidence}%</td>
+        </tr>
+    `).join('');
+}
+
+function updateLastUpdateTime() {
+    const now = new Date();
+    document.getElementById('lastUpdate').textContent = 
+        `Last updated: ${now.toLocaleTimeString()}`;
+}
+
+function showError() {
+    const statusCard = document.getElementById('statusCard');
+    statusCard.className = 'inline-block px-8 py-4 rounded-xl font-bold text-2xl transition-all duration-500 bg-red-600 text-white';
+    statusCard.innerHTML = '<i class="fas fa-exclamation-triangle mr-2"></i>Connection Error';
+}
+
+function downloadCSV() {
+    if (predictionHistory.length === 0) {
+        alert('No data to download');
+        return;
+    }
+
+    const headers = ['Timestamp', 'Temperature (°C)', 'Smoke (ppm)', 'Gas', 'Prediction', 'Confidence (%)'];
+    const csvContent = [
+        headers.join(','),
+        ...predictionHistory.map(item => 
+            [item.timestamp, item.temperature, item.smoke, item.gas, item.prediction, item.confidence].join(',')
+        )
+    ].join('\n');
+
+    const blob = new Blob([csvContent], { type: 'text/csv' });
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = `fire_detection_history_${new Date().toISOString().split('T')[0]}.csv`;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    window.URL.revokeObjectURL(url);
+}
+
+// Event listeners
+document.getElementById('downloadCsv').addEventListener('click', downloadCSV);
+
+// Start fetching data
+fetchFireStatus();
+setInterval(fetchFireStatus, 3000);
@@ -0,0 +1,797 @@
+// History series, in the order of the combined chart's datasets
+const HISTORY_KEYS = ['temp', 'smoke', 'co', 'lpg', 'gasValue', 'pressure'];
+
+function createChart(ctx, label, color) {
+    return new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: Array(20).fill(''),
+            datasets: [{
+                label: label,
+                data: Array(20).fill(null),
+                borderColor: color,
+                tension: 0.4,
+                fill: true,
+                backgroundColor: color.replace(')', ', 0.1)').replace('rgb', 'rgba')
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    grid: { color: 'rgba(255, 255, 255, 0.1)' },
+                    ticks: { color: '#f5f6fa' }
+                },
+                x: {
+                    grid: { color: 'rgba(255, 255, 255, 0.1)' },
+                    ticks: { color: '#f5f6fa' }
+                }
+            },
+            plugins: {
+                legend: {
+                    labels: { color: '#f5f6fa' }
+                }
+            }
+        }
+    });
+}
+
+const tempChart = createChart(document.getElementById('tempChart').getContext('2d'), 'Temperature (°C)', 'rgb(74, 144, 226)');
+const smokeChart = createChart(document.getElementById('smokeChart').getContext('2d'), 'Smoke (ppm)', 'rgb(231, 76, 60)');
+const coChart = createChart(document.getElementById('coChart').getContext('2d'), 'CO (ppm)', 'rgb(243, 156, 18)');
+const lpgChart = createChart(document.getElementById('lpgChart').getContext('2d'), 'LPG (ppm)', 'rgb(46, 204, 113)');
+const gasChart = createChart(document.getElementById('gasChart').getContext('2d'), 'Gas Value', 'rgb(155, 89, 182)');
+const pressureChart = createChart(document.getElementById('pressureChart').getContext('2d'), 'Pressure (hPa)', 'rgb(26, 188, 156)');
+
+// Create combined chart
+const combinedChart = new Chart(document.getElementById('combinedChart').getContext('2d'), {
+    type: 'line',
+    data: {
+        labels: Array(20).fill(''),
+        datasets: [
+            {
+                label: 'Temperature (°C)',
+                data: Array(20).fill(null),
+                borderColor: 'rgb(74, 144, 226)',
+                tension: 0.4
+            },
+            {
+                label: 'Smoke (ppm)',
+                data: Array(20).fill(null),
+                borderColor: 'rgb(231, 76, 60)',
+                tension: 0.4
+            },
+            {
+                label: 'CO (ppm)',
+                data: Array(20).fill(null),
+                borderColor: 'rgb(243, 156, 18)',
+                tension: 0.4
+            },
+            {
+                label: 'LPG (ppm)',
+                data: Array(20).fill(null),
+                borderColor: 'rgb(46, 204, 113)',
+                tension: 0.4
+            },
+            {
+                label: 'Gas Value',
+                data: Array(20).fill(null),
+                borderColor: 'rgb(155, 89, 182)',
+                tension: 0.4
+            },
+            {
+                label: 'Pressure (hPa)',
+                data: Array(20).fill(null),
+                borderColor: 'rgb(26, 188, 156)',
+                tension: 0.4
+            }
+        ]
+    },
+    options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        scales: {
+            y: {
+                beginAtZero: true,
+                grid: { color: 'rgba(255, 255, 255, 0.1)' },
+                ticks: { color: '#f5f6fa' }
+            },
+            x: {
+                grid: { color: 'rgba(255, 255, 255, 0.1)' },
+                ticks: { color: '#f5f6fa' }
+            }
+        },
+        plugins: {
+            legend: {
+                labels: { color: '#f5f6fa' }
+            }
+        }
+    }
+});
+
+function updateChart(newData) {
+    const date = new Date();
+    const timeStr = date.toLocaleTimeString();
+
+    function updateSingleChart(chart, value, timeElementId) {
+        chart.data.labels.shift();
+        chart.data.labels.push(timeStr);
+        chart.data.datasets[0].data.shift();
+        chart.data.datasets[0].data.push(value);
+        chart.update();
+        document.getElementById(timeElementId).innerText = 'Updated: ' + timeStr;
+    }
+
+    updateSingleChart(tempChart, newData.temp, 'tempTime');
+    updateSingleChart(smokeChart, newData.smoke, 'smokeTime');
+    updateSingleChart(coChart, newData.co, 'coTime');
+    updateSingleChart(lpgChart, newData.lpg, 'lpgTime');
+    updateSingleChart(gasChart, newData.gasValue, 'gasTime');
+    updateSingleChart(pressureChart, newData.pressure, 'pressureTime');
+
+    // Update combined chart
+    combinedChart.data.labels.shift();
+    combinedChart.data.labels.push(timeStr);
+    combinedChart.data.datasets[0].data.shift();
+    combinedChart.data.datasets[0].data.push(newData.temp);
+    combinedChart.data.datasets[1].data.shift();
+    combinedChart.data.datasets[1].data.push(newData.smoke);
+    combinedChart.data.datasets[2].data.shift();
+    combinedChart.data.datasets[2].data.push(newData.co);
+    combinedChart.data.datasets[3].data.shift();
+    combinedChart.data.datasets[3].data.push(newData.lpg);
+    combinedChart.data.datasets[4].data.shift();
+    combinedChart.data.datasets[4].data.push(newData.gasValue);
+    combinedChart.data.datasets[5].data.shift();
+    combinedChart.data.datasets[5].data.push(newData.pressure);
+    combinedChart.update();
+    document.getElementById('combinedTime').innerText = 'Updated: ' + timeStr;
+}
+
+// Alarm sound variables
+let audioContext = null;
+let isAlarmPlaying = false;
+let vigorousAlarmInterval = null;
+let flashInterval = null;
+
+// Initialize audio context
+function initAudio() {
+    if (!audioContext) {
+        try {
+            audioContext = new (window.AudioContext || window.webkitAudioContext)();
+        } catch (e) {
+            console.log('Audio not supported');
+        }
+    }
+}
+
+// Create vigorous alarm sound pattern
+function playVigorousAlarmBeep() {
+    if (!audioContext) return;
+
+    // Triple beep pattern for urgency
+    for (let i = 0; i < 3; i++) {
+        setTimeout(() => {
+            const oscillator = audioContext.createOscillator();
+            const gainNode = audioContext.createGain();
+
+            oscillator.connect(gainNode);
+            gainNode.connect(audioContext.destination);
+
+            // Alternating high and low frequency for urgency
+            const freq = i % 2 === 0 ? 1400 : 900;
+            oscillator.frequency.setValueAtTime(freq, audioContext.currentTime);
+            oscillator.frequency.setValueAtTime(freq + 200, audioContext.currentTime + 0.1);
+            oscillator.frequency.setValueAtTime(freq, audioContext.currentTime + 0.2);
+
+            gainNode.gain.setValueAtTime(0.4, audioContext.currentTime);
+            gainNode.gain.exponentialRampToValueAtTime(0.01, audioContext.currentTime + 0.3);
+
+            oscillator.start(audioContext.currentTime);
+            oscillator.stop(audioContext.currentTime + 0.3);
+        }, i * 150); // 150ms between each beep
+    }
+}
+
+// Create screen flash effect
+function flashScreen() {
+    const overlay = document.createElement('div');
+    overlay.style.cssText = `
+        position: fixed;
+        top: 0;
+        left: 0;
+        width: 100vw;
+        height: 100vh;
+        background: rgba(214, 48, 49, 0.3);
+        z-index: 9999;
+        pointer-events: none;
+        animation: flashEffect 0.3s ease-in-out;
+    `;
+
+    // Add flash animation
+    const style = document.createElement('style');
+    style.textContent = `
+        @keyframes flashEffect {
+            0% { opacity: 0; }
+            50% { opacity: 1; }
+            100% { opacity: 0; }
+        }
+    `;
+    document.head.appendChild(style);
+    document.body.appendChild(overlay);
+
+    setTimeout(() => {
+        document.body.removeChild(overlay);
+        document.head.removeChild(style);
+    }, 300);
+}
+
+// Start vigorous alarm
+function startAlarm() {
+    if (isAlarmPlaying) return;
+    initAudio();
+    if (!audioContext) return;
+
+    isAlarmPlaying = true;
+
+    // Immediate first alarm
+    playVigorousAlarmBeep();
+    flashScreen();
+
+    // Set up repeated vigorous alarms every 800ms
+    vigorousAlarmInterval = setInterval(() => {
+        playVigorousAlarmBeep();
+    }, 800);
+
+    // Set up screen flash every 1.2 seconds
+    flashInterval = setInterval(flashScreen, 1200);
+
+    // Add visual pulsing to danger cards
+    const dangerCards = document.querySelectorAll('.value.danger');
+    dangerCards.forEach(card => {
+        card.style.animation = 'vigorousPulse 0.5s infinite';
+    });
+
+    // Add vigorous pulse animation
+    const pulseStyle = document.createElement('style');
+    pulseStyle.id = 'vigorousPulseStyle';
+    pulseStyle.textContent = `
+        @keyframes vigorousPulse {
+            0% { 
+                transform: scale(1); 
+                text-shadow: 0 0 10px var(--danger);
+            }
+            25% { 
+                transform: scale(1.1); 
+                text-shadow: 0 0 20px var(--danger), 0 0 30px var(--danger);
+            }
+            50% { 
+                transform: scale(1.2); 
+                text-shadow: 0 0 30px var(--danger), 0 0 40px var(--danger);
+            }
+            75% { 
+                transform: scale(1.1); 
+                text-shadow: 0 0 20px var(--danger), 0 0 30px var(--danger);
+            }
+            100% { 
+                transform: scale(1); 
+                text-shadow: 0 0 10px var(--danger);
+            }
+        }
+    `;
+    document.head.appendChild(pulseStyle);
+}
+
+// Stop alarm
+function stopAlarm() {
+    if (vigorousAlarmInterval) {
+        clearInterval(vigorousAlarmInterval);
+        vigorousAlarmInterval = null;
+    }
+    if (flashInterval) {
+        clearInterval(flashInterval);
+        flashInterval = null;
+    }
+
+    // Remove visual effects
+    const dangerCards = document.querySelectorAll('.value.danger');
+    dangerCards.forEach(card => {
+        card.style.animation = '';
+    });
+
+    // Remove vigorous pulse style
+    const pulseStyle = document.getElementById('vigorousPulseStyle');
+    if (pulseStyle) {
+        document.head.removeChild(pulseStyle);
+    }
+
+    isAlarmPlaying = false;
+}
+
+// Function to update only card values
+function updateCards(data) {
+    // Update fire status (first card)
+    const fireStatus = document.querySelector('.card:nth-child(1) .value');
+    fireStatus.textContent = data.fire ? '🔥 DANGER' : '✅ SAFE';
+    fireStatus.className = `value ${data.fire ? 'danger' : 'safe'}`;
+
+    // Find and update each card by looking for the label text
+    const cards = document.querySelectorAll('.card');
+    cards.forEach(card => {
+        const label = card.querySelector('.label');
+        const valueElement = card.querySelector('.value');
+
+        if (label && valueElement) {
+            const labelText = label.textContent.toLowerCase();
+
+            if (labelText.includes('temperature')) {
+                valueElement.textContent = `${data.temp.toFixed(1)}°C`;
+            } else if (labelText.includes('smoke')) {
+                valueElement.textContent = `${data.smoke.toFixed(1)} ppm`;
+            } else if (labelText.includes('co level')) {
+                valueElement.textContent = `${data.co.toFixed(1)} ppm`;
+            } else if (labelText.includes('lpg')) {
+                valueElement.textContent = `${data.lpg.toFixed(1)} ppm`;
+            } else if (labelText.includes('gas value')) {
+                valueElement.textContent = data.gasValue;
+            } else if (labelText.includes('air quality')) {
+                valueElement.textContent = data.aqi;
+                valueElement.className = `value ${data.aqi > 150 ? 'danger' : 'safe'}`;
+            }
+        }
+    });
+
+    // Handle alarm based on fire status
+    if (data.fire) {
+        startAlarm();
+    } else {
+        stopAlarm();
+    }
+}
+
+// Points per metric requested when a history chart is opened
+const HISTORY_POINTS = 500;
+
+// Function to fetch the current reading from the /update endpoint (history is fetched per chart)
+function fetchSensorData() {
+    fetch('/update?history=0')
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Network response was not ok');
+            }
+            return response.json();
+        })
+        .then(handleSensorData)
+        .catch(error => {
+            console.error('Error fetching sensor data:', error);
+        });
+}
+
+// Apply an /update payload (from polling or the 'reading' stream event)
+function handleSensorData(data) {
+    if (data && data.current) {
+        updateCards(data.current);
+        updateChart(data.current);
+    }
+}
+
+// Function to fetch AI prediction from Bomma
+function fetchAIPrediction() {
+    fetch('/fire-status')
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Network response was not ok');
+            }
+            return response.json();
+        })
+        .then(data => {
+            updateAIPrediction(data);
+        })
+        .catch(error => {
+            console.error('Error fetching AI prediction:', error);
+            updateAIPredictionError();
+        });
+}
+
+// Function to update AI prediction display
+function updateAIPrediction(data) {
+    const aiPredictionValue = document.getElementById('aiPredictionValue');
+    const aiConfidence = document.getElementById('aiConfidence');
+
+    if (data.prediction === 'Fire Detected') {
+        aiPredictionValue.textContent = '🔥 FIRE DETECTED';
+        aiPredictionValue.className = 'value danger';
+    } else {
+        aiPredictionValue.textContent = '✅ NO FIRE';
+        aiPredictionValue.className = 'value safe';
+    }
+
+    const confidencePercent = (data.confidence * 100).toFixed(1);
+    aiConfidence.textContent = `Confidence: ${confidencePercent}%`;
+
+    // Update prediction source to show if AI-powered or threshold-based
+    const predictionSource = document.getElementById('predictionSource');
+    if (data.ai_powered) {
+        predictionSource.textContent = 'Bomma AI Detection';
+    } else {
+        predictionSource.textContent = 'Threshold Detection';
+    }
+}
+
+// Function to handle AI prediction errors
+function updateAIPredictionError() {
+    const aiPredictionValue = document.getElementById('aiPredictionValue');
+    const aiConfidence = document.getElementById('aiConfidence');
+
+    aiPredictionValue.textContent = '❌ Connection Error';
+    aiPredictionValue.className = 'value';
+    aiConfidence.textContent = 'Confidence: --%';
+}
+
+// Function to check and update status
+function checkStatus() {
+    fetch('/status')
+        .then(response => response.json())
+        .then(updateStatus)
+        .catch(error => {
+            console.error('Error checking status:', error);
+            const statusDot = document.getElementById('statusDot');
+            const statusText = document.getElementById('statusText');
+            statusDot.className = 'status-dot offline';
+            statusText.className = 'status-text offline';
+            statusText.textContent = 'OFFLINE';
+        });
+}
+
+function updateStatus(data) {
+    const statusDot = document.getElementById('statusDot');
+    const statusText = document.getElementById('statusText');
+
+    statusText.textContent = data.status;
+
+    if (data.status === 'ONLINE') {
+        statusDot.className = 'status-dot online';
+        statusText.className = 'status-text online';
+    } else {
+        statusDot.className = 'status-dot offline';
+        statusText.className = 'status-text offline';
+    }
+}
+
+// Fallback polling when Server-Sent Events are unavailable
+let pollingStarted = false;
+function startPolling() {
+    if (pollingStarted) return;
+    pollingStarted = true;
+
+    // Update sensor data every 2 seconds
+    setInterval(fetchSensorData, 2000);
+
+    // Fetch AI prediction every 3 seconds
+    setInterval(fetchAIPrediction, 3000);
+
+    // Check status every 3 seconds
+    setInterval(checkStatus, 3000);
+
+    // Check external fire alert every 3 seconds
+    setInterval(updateFireAlert, 3000);
+
+    // Initial checks
+    fetchSensorData();
+    checkStatus();
+    fetchAIPrediction();
+    updateFireAlert();
+}
+
+// Server pushes reading, prediction, status and external-alert events only on change
+function startStream() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+    const source = new EventSource('/stream');
+    source.addEventListener('reading', e => handleSensorData(JSON.parse(e.data)));
+    source.addEventListener('prediction', e => updateAIPrediction(JSON.parse(e.data)));
+    source.addEventListener('status', e => updateStatus(JSON.parse(e.data)));
+    source.addEventListener('external_alert', e => renderFireAlert(JSON.parse(e.data)));
+    source.onerror = () => {
+        // CONNECTING means the browser is retrying; CLOSED means the stream is not available
+        if (source.readyState === EventSource.CLOSED) {
+            startPolling();
+        }
+    };
+}
+
+document.addEventListener('DOMContentLoaded', startStream);
+
+// Enable audio on first user interaction (required by some browsers)
+document.addEventListener('click', function enableAudio() {
+    initAudio();
+    if (audioContext && audioContext.state === 'suspended') {
+        audioContext.resume();
+    }
+}, { once: true });
+
+// Back to top functionality
+function scrollToTop() {
+    window.scrollTo({
+        top: 0,
+        behavior: 'smooth'
+    });
+}
+
+// Show/hide back to top button based on scroll position
+window.addEventListener('scroll', function() {
+    const backToTopBtn = document.getElementById('backToTop');
+    if (window.pageYOffset > 300) {
+        backToTopBtn.style.display = 'block';
+    } else {
+        backToTopBtn.style.display = 'none';
+    }
+});
+
+// Update last received time in footer
+function updateLastReceivedTime() {
+    const now = new Date();
+    const timeStr = now.toLocaleString('en-US', {
+        hour: 'numeric',
+        minute: '2-digit',
+        hour12: true,
+        month: 'long',
+        day: 'numeric',
+        year: 'numeric'
+    });
+    document.getElementById('lastUpdateTime').textContent = `Last data received at: ${timeStr}`;
+}
+
+// Update last received time when new data arrives
+const originalUpdateChart = updateChart;
+updateChart = function(newData) {
+    originalUpdateChart(newData);
+    updateLastReceivedTime();
+};
+
+// Hide main graph container initially
+document.getElementById('mainGraphContainer').style.display = 'none';
+
+// Handle analytics button using onclick
+function toggleAnalytics() {
+    const graphContainer = document.getElementById('mainGraphContainer');
+    const analyticsBtn = document.querySelector('.analytics-btn');
+    const isHidden = graphContainer.style.display === 'none';
+    graphContainer.style.display = isHidden ? 'block' : 'none';
+    analyticsBtn.textContent = isHidden ? 'HIDE ANALYTICS' : 'ANALYTICS';
+}
+
+// Handle history buttons
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.history-btn').forEach(button => {
+        if (button && button.dataset && button.dataset.chart) {
+            button.addEventListener('click', async function() {
+                const chartType = this.dataset.chart;
+                const chart = {
+                    'temp': tempChart,
+                    'smoke': smokeChart,
+                    'co': coChart,
+                    'lpg': lpgChart,
+                    'gasValue': gasChart,
+                    'pressure': pressureChart,
+                    'combined': combinedChart
+                }[chartType];
+
+                if (!chart) return;
+
+                const showingHistory = this.textContent === 'Show History';
+                this.textContent = showingHistory ? 'Show Current' : 'Show History';
+
+                // Ask the server for a downsampled (LTTB) history instead of plotting every row
+                let history = null;
+                if (showingHistory) {
+                    try {
+                        const response = await fetch(`/update?format=columnar&points=${HISTORY_POINTS}`);
+                        if (response.ok) {
+                            history = (await response.json()).historical;
+                        }
+                    } catch (error) {
+                        console.error('Error fetching history:', error);
+                    }
+                }
+
+                if (showingHistory && history && history.timestamps) {
+                    const timestamps = history.timestamps.map(t => new Date(t).toLocaleTimeString());
+
+                    if (chartType === 'combined') {
+                        // Update all datasets in combined chart
+                        HISTORY_KEYS.forEach((key, index) => {
+                            if (chart.data.datasets[index] && history[key]) {
+                                chart.data.labels = timestamps;
+                                chart.data.datasets[index].data = history[key];
+                            }
+                        });
+                    } else {
+                        chart.data.labels = timestamps;
+                        chart.data.datasets[0].data = history[chartType] || [];
+                    }
+                } else {
+                    chart.data.labels = Array(20).fill('');
+                    if (chartType === 'combined') {
+                        chart.data.datasets.forEach(dataset => {
+                            dataset.data = Array(20).fill(null);
+                        });
+                    } else {
+                        chart.data.datasets[0].data = Array(20).fill(null);
+                    }
+                }
+                chart.update();
+            });
+        }
+    });
+});
+
+// Function to download CSV report
+async function downloadReport(timeRange) {
+    const reportStatus = document.getElementById('reportStatus');
+    reportStatus.textContent = 'Generating report...';
+    reportStatus.className = '';
+
+    try {
+        // The export runs as a background job on the server; poll it, then download the finished file
+        const response = await fetch('/exports', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ range: timeRange, format: 'csv' })
+        });
+        if (!response.ok) {
+            throw new Error('Failed to start report');
+        }
+
+        let job = await response.json();
+        while (job.status === 'queued' || job.status === 'running') {
+            if (job.total) {
+                reportStatus.textContent = `Generating report... ${Math.floor(job.progress * 100)}% (${job.rows} of ${job.total} rows)`;
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const poll = await fetch(job.status_url);
+            if (!poll.ok) {
+                throw new Error('Lost track of report job');
+            }
+            job = await poll.json();
+        }
+        if (job.status !== 'done') {
+            throw new Error(job.error || 'Failed to generate report');
+        }
+        if (!job.rows) {
+            throw new Error('No data found for the selected time range');
+        }
+
+        const a = document.createElement('a');
+        a.href = job.download_url;
+        a.download = job.filename;
+
+        document.body.appendChild(a);
+        a.click();
+        document.body.removeChild(a);
+
+        reportStatus.textContent = `✅ Report downloaded successfully: ${job.filename}`;
+        reportStatus.className = 'success';
+
+        // Reset status after 5 seconds
+        setTimeout(() => {
+            reportStatus.textContent = 'Click a button above to generate and download your report';
+            reportStatus.className = '';
+        }, 5000);
+
+    } catch (error) {
+        console.error('Error downloading report:', error);
+        reportStatus.textContent = '❌ Error generating report. Please try again.';
+        reportStatus.className = 'error';
+
+        // Reset status after 5 seconds
+        setTimeout(() => {
+            reportStatus.textContent = 'Click a button above to generate and download your report';
+            reportStatus.className = '';
+        }, 5000);
+    }
+}
+
+// Chatbot functionality
+let isChatbotOpen = false;
+
+function toggleChatbot() {
+    const chatbot = document.getElementById('chatbotContainer');
+    const floatButton = document.querySelector('.chat-float-button');
+    isChatbotOpen = !isChatbotOpen;
+    chatbot.style.display = isChatbotOpen ? 'flex' : 'none';
+
+    // Toggle active state
+    if (isChatbotOpen) {
+        floatButton.classList.add('active');
+    } else {
+        floatButton.classList.remove('active');
+    }
+}
+
+function sendMessage() {
+    const input = document.getElementById('chatInput');
+    const message = input.value.trim();
+    if (!message) return;
+
+    addChatMessage(message, 'user');
+    input.value = '';
+
+    // Simulate bot response
+    setTimeout(() => {
+        const response = getBotResponse(message);
+        addChatMessage(response, 'bot');
+    }, 1000);
+}
+
+function addChatMessage(message, sender) {
+    const messagesContainer = document.getElementById('chatMessages');
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `chat-message ${sender}`;
+    messageDiv.innerHTML = message;
+    messagesContainer.appendChild(messageDiv);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+}
+
+function getBotResponse(message) {
+    const lowerMessage = message.toLowerCase();
+
+    if (lowerMessage.includes('temperature') || lowerMessage.includes('temp')) {
+        return `🌡️ Current temperature is ${temperature.toFixed(1)}°C. Normal range is 15-35°C. ${temperature > 35 ? 'Temperature is above normal - please check for heat sources!' : 'Temperature is within normal range.'}`;
+    } else if (lowerMessage.includes('smoke')) {
+        return `💨 Current smoke level is ${smoke.toFixed(1)} ppm. Normal range is below 50 ppm. ${smoke > 50 ? 'Smoke levels are elevated - fire risk detected!' : 'Smoke levels are normal.'}`;
+    } else if (lowerMessage.includes('fire') || lowerMessage.includes('danger')) {
+        return `🔥 Fire status: ${fire_detected ? '⚠️ FIRE DETECTED! Please evacuate immediately and call emergency services!' : '✅ No fire detected. All systems normal.'}`;
+    } else if (lowerMessage.includes('gas') || lowerMessage.includes('lpg')) {
+        return `⛽ Current gas value is ${gasValue}. LPG level is ${lpg.toFixed(1)} ppm. Normal gas value should be below 500, and LPG below 1000 ppm.`;
+    } else if (lowerMessage.includes('co') || lowerMessage.includes('carbon monoxide')) {
+        return `⚠️ Current CO level is ${co.toFixed(1)} ppm. Safe level is below 9 ppm. ${co > 9 ? 'CO levels are dangerous - ensure proper ventilation!' : 'CO levels are safe.'}`;
+    } else if (lowerMessage.includes('aqi') || lowerMessage.includes('air quality')) {
+        return `🌬️ Current Air Quality Index is ${aqi}. Good air quality is 0-150. ${aqi > 150 ? 'Air quality is poor - consider using air purifiers.' : 'Air quality is acceptable.'}`;
+    } else if (lowerMessage.includes('status') || lowerMessage.includes('system')) {
+        return `📊 System Status: ${last_data_received ? 'Online - receiving data every few seconds' : 'Offline - no recent data'}. All sensors are monitoring continuously for your safety.`;
+    } else if (lowerMessage.includes('help') || lowerMessage.includes('what can you do')) {
+        return `🤖 I can help you with:\n• Real-time sensor readings\n• Fire safety explanations\n• Understanding normal vs dangerous levels\n• System status information\n• Emergency guidance\n\nJust ask me about any sensor or safety concern!`;
+    } else if (lowerMessage.includes('emergency') || lowerMessage.includes('evacuation')) {
+        return `🚨 EMERGENCY PROTOCOL:\n1. Stay calm and alert others\n2. Use nearest exit - don't use elevators\n3. Call emergency services (911/local)\n4. Meet at designated safe area\n5. Don't re-enter until cleared by authorities\n\nYour safety is the top priority!`;
+    } else if (lowerMessage.includes('normal') || lowerMessage.includes('safe')) {
+        return `✅ SAFE RANGES:\n🌡️ Temperature: 15-35°C\n💨 Smoke: <50 ppm\n⚠️ CO: <9 ppm\n⛽ LPG: <1000 ppm\n🌬️ Gas Value: <500\n🌍 AQI: 0-150\n\nCurrent readings are being monitored 24/7!`;
+    } else {
+        return `🤖 I understand you're asking about "${message}". I specialize in fire detection and safety. Try asking me about:\n• Sensor readings (temperature, smoke, gas, CO, AQI)\n• Fire status and safety\n• Emergency procedures\n• Normal vs dangerous levels\n\nWhat specific safety information would you like?`;
+    }
+}
+
+function handleChatKeyPress(event) {
+    if (event.key === 'Enter') {
+        sendMessage();
+    }
+}
+
+function updateFireAlert() {
+  fetch("/fire-status")
+    .then(res => res.json())
+    .then(renderFireAlert);
+}
+
+function renderFireAlert(data) {
+  const container = document.getElementById("fire-alert-container");
+  if (data.external_fire_alert) {
+    container.innerHTML = `
+      <div class="alert alert-danger" style="font-size:2rem;margin-bottom:1rem;padding:1rem;background:#d63031;color:white;border-radius:1rem;text-align:center;">
+        🔥 FIRE DETECTED BY AI!
+      </div>
+    `;
+  } else {
+    container.innerHTML = `
+      <div class="alert alert-success" style="font-size:2rem;margin-bottom:1rem;padding:1rem;background:#00b894;color:white;border-radius:1rem;text-align:center;">
+        ✅ SAFE (AI)
+      </div>
+    `;
+  }
+}
+
+// Polled every 3 seconds only when the event stream is unavailable (see startPolling)
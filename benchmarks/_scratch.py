@@ -0,0 +1,59 @@
+"""Scratch environments for the benchmarks, so the real database, exports and
+model cache are left alone.
+
+app_copy() copies the app (every .py, fire_model.pkl and assets/) into a
+temporary directory, for benchmarks that run main.py or gunicorn. Benchmarks
+that only need a database use scratch_database(), which points
+SENSOR_DB_PATH and EXPORT_DIR at a temporary directory instead; import the
+app modules inside it, as db.py reads SENSOR_DB_PATH at import.
+"""
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+@contextlib.contextmanager
+def app_copy(prefix, importable=False):
+    """Yield a scratch copy of the app; importable=True also makes it the working directory
+    and puts it first on sys.path, for benchmarks that import main in-process."""
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    cwd = os.getcwd()
+    try:
+        for entry in os.listdir(ROOT):
+            if entry.endswith(".py") or entry == "fire_model.pkl":
+                shutil.copy(os.path.join(ROOT, entry), workdir)
+        shutil.copytree(os.path.join(ROOT, "assets"), os.path.join(workdir, "assets"))
+        if importable:
+            os.chdir(workdir)
+            sys.path.insert(0, workdir)
+        yield workdir
+    finally:
+        if importable:
+            os.chdir(cwd)
+            if workdir in sys.path:
+                sys.path.remove(workdir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def scratch_database(prefix):
+    """Yield a temporary directory holding the database and exports, with the app importable."""
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    saved = {name: os.environ.get(name) for name in ("SENSOR_DB_PATH", "EXPORT_DIR")}
+    os.environ["SENSOR_DB_PATH"] = os.path.join(workdir, "sensor_data.db")
+    os.environ["EXPORT_DIR"] = os.path.join(workdir, "exports")
+    sys.path.insert(0, ROOT)
+    try:
+        yield workdir
+    finally:
+        sys.path.remove(ROOT)
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,74 @@
+"""Latency of /api/aggregate queries, from the rollups and straight from sensor_readings.
+
+Fills a scratch database with N synthetic readings (one every few seconds
+back from now), builds the rollups with the backfill, then times
+aggregates.aggregate() for a few range/bucket combinations: avg and max
+with and without the rollups, and p95 (always ranked over raw rows).
+Run it at 1M and 10M rows:
+
+    python benchmarks/bench_aggregate.py [rows]
+"""
+import statistics
+import sys
+import time
+
+import _scratch
+
+STEP_MS = 3000
+DAY_MS = 24 * 3600 * 1000
+QUERIES = (("1 day", DAY_MS, "5m"), ("7 days", 7 * DAY_MS, "5m"), ("7 days", 7 * DAY_MS, "1h"),
+           ("30 days", 30 * DAY_MS, "1h"), ("365 days", 365 * DAY_MS, "1d"))
+
+
+def timed(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def main(rows):
+    # A scratch database, so the real one is left alone
+    with _scratch.scratch_database("bench-aggregate-"):
+        import aggregates
+        import db
+        import ingest
+        import rollups
+
+        db.migrate()
+        conn = db.get_connection()
+        now = db.now_ms()
+        start = time.perf_counter()
+        with conn:
+            conn.executemany(ingest.INSERT_SQL,
+                             ((now - i * STEP_MS, i % 97 == 0, 20 + i % 50, i % 400, 1.5, 2.0, i % 900, 1013.2, i % 300)
+                              for i in range(rows)))
+        loaded = time.perf_counter() - start
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        rollups.backfill(conn)
+        conn.commit()
+        print(f"{rows} readings over {rows * STEP_MS / DAY_MS:.0f} days; insert {loaded:.1f} s, "
+              f"rollup backfill {time.perf_counter() - start:.1f} s")
+
+        # Unaligned bounds, as a "last N days" request would have
+        to_ms = now - 12345
+        for label, length, bucket in QUERIES:
+            from_ms = to_ms - length
+            bucket_ms = aggregates.parse_bucket(bucket)
+            line = f"{label:>8} / {bucket:>2}:"
+            for fn in ("avg", "max"):
+                result, rollup_time = timed(lambda: aggregates.aggregate(conn, "smoke", bucket_ms, from_ms, to_ms, fn))
+                raw, raw_time = timed(lambda: aggregates.aggregate(conn, "smoke", bucket_ms, from_ms, to_ms, fn,
+                                                                   use_rollups=False))
+                assert result["counts"] == raw["counts"]
+                line += f"   {fn} {rollup_time * 1000:7.1f} ms (raw {raw_time * 1000:8.1f} ms)"
+            result, p95_time = timed(lambda: aggregates.aggregate(conn, "smoke", bucket_ms, from_ms, to_ms, "p95"))
+            line += f"   p95 {p95_time * 1000:8.1f} ms   {len(result['timestamps'])} buckets"
+            print(line)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,48 @@
+"""Compare the row-of-dicts and columnar history payloads.
+
+Reports build time, JSON encode time and payload size for synthetic
+history at 10k, 100k and 1M rows:
+
+    python benchmarks/bench_history_format.py [rows ...]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from history import build_history_columnar, build_history_rows  # noqa: E402
+
+
+def make_history(n):
+    rng = random.Random(42)
+    start = 1_700_000_000_000
+    return [(start + i * 2000, 0,
+             round(rng.uniform(20, 40), 2), round(rng.uniform(0, 50), 2),
+             round(rng.uniform(0, 10), 2), round(rng.uniform(0, 10), 2),
+             rng.randint(100, 400), round(rng.uniform(990, 1020), 2), rng.randint(20, 150))
+            for i in range(n)]
+
+
+def measure(builder, history):
+    start = time.perf_counter()
+    payload = builder(history)
+    built = time.perf_counter()
+    body = json.dumps(payload, separators=(",", ":"))
+    encoded = time.perf_counter()
+    return (built - start) * 1000, (encoded - built) * 1000, len(body)
+
+
+def main(sizes):
+    print(f"{'rows':>9} {'format':>9} {'build ms':>10} {'encode ms':>10} {'bytes':>14}")
+    for n in sizes:
+        history = make_history(n)
+        for name, builder in (("rows", build_history_rows), ("columnar", build_history_columnar)):
+            build_ms, encode_ms, size = measure(builder, history)
+            print(f"{n:>9} {name:>9} {build_ms:>10.1f} {encode_ms:>10.1f} {size:>14,}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,75 @@
+"""Compare DataFrame and ndarray model inputs for fire_model.pkl.
+
+Times feature construction plus model.predict for one reading and for a
+batch of readings, built the old way (pandas DataFrame with named columns),
+through features.FeatureBuilder, and through the compiled flat-array
+evaluator from compiled_model:
+
+    python benchmarks/bench_inference.py [iterations]
+"""
+import os
+import random
+import sys
+import time
+import warnings
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import joblib  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from compiled_model import compile_model  # noqa: E402
+from features import FeatureBuilder  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+
+def make_readings(n):
+    rng = random.Random(7)
+    return [{"temperature": rng.uniform(15, 90), "smoke": rng.uniform(0, 800), "gas": rng.uniform(0, 900)}
+            for _ in range(n)]
+
+
+def timeit(fn, iterations):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations):
+    model = joblib.load(os.path.join(ROOT, "fire_model.pkl"))
+    builder = FeatureBuilder.for_model(model)
+    compiled = compile_model(model)
+    columns = list(builder.feature_names)
+
+    for size in (1, 100, 1000):
+        readings = make_readings(size)
+
+        def with_dataframe():
+            frame = pd.DataFrame([[r[name] for name in columns] for r in readings], columns=columns)
+            return model.predict(frame)
+
+        def with_ndarray():
+            return model.predict(builder.rows(readings))
+
+        df_us = timeit(with_dataframe, iterations)
+        nd_us = timeit(with_ndarray, iterations)
+        line = (f"batch={size:>5}  DataFrame {df_us:>10.1f} us   ndarray {nd_us:>10.1f} us   "
+                f"speedup {df_us / nd_us:>5.2f}x")
+        if compiled is not None:
+            compiled_us = timeit(lambda: compiled.predict(builder.rows(readings)), iterations)
+            line += f"   compiled {compiled_us:>8.1f} us"
+        print(line)
+
+    # Feature construction alone, where the DataFrame overhead actually lives
+    reading = make_readings(1)[0]
+    df_build = timeit(lambda: pd.DataFrame([[reading[name] for name in columns]], columns=columns), iterations * 10)
+    nd_build = timeit(lambda: builder.row(reading), iterations * 10)
+    print(f"build one row: DataFrame {df_build:.1f} us   ndarray {nd_build:.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
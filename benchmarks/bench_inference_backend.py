@@ -0,0 +1,88 @@
+"""Compare the in-process and process-pool inference backends.
+
+For each backend, N client threads call predict on single readings while
+one more thread runs a small pure-Python "request" (standing in for
+/status or / rendering) in a loop. Reports prediction throughput and
+latency, plus the side task's latency, which shows how much inference
+holding the GIL stalls unrelated work:
+
+    python benchmarks/bench_inference_backend.py [threads] [seconds]
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+import warnings
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import joblib  # noqa: E402
+import numpy as np  # noqa: E402
+
+from compiled_model import compile_model  # noqa: E402
+from inference import ProcessInferenceBackend  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+
+def side_task():
+    # Roughly the CPU cost of building a small JSON status response
+    return sum(i * i for i in range(2000))
+
+
+def run(name, predict, threads, seconds):
+    X = np.array([[45.0, 250.0, 380.0]])
+    predict(X)  # warm up (starts the pool for the process backend)
+    stop = time.perf_counter() + seconds
+    latencies, side = [], []
+    lock = threading.Lock()
+
+    def client():
+        local = []
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            predict(X)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    def observer():
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            side_task()
+            side.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    workers = [threading.Thread(target=client) for _ in range(threads)] + [threading.Thread(target=observer)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    def pct(values, q):
+        return sorted(values)[int(q * (len(values) - 1))] * 1000
+
+    print(f"{name:>9}: {len(latencies) / seconds:>8.0f} predictions/s   "
+          f"predict p50 {pct(latencies, 0.5):6.2f} ms p99 {pct(latencies, 0.99):6.2f} ms   "
+          f"side task p50 {statistics.median(side) * 1000:6.2f} ms p99 {pct(side, 0.99):6.2f} ms")
+
+
+def main(threads, seconds):
+    model = joblib.load(os.path.join(ROOT, "fire_model.pkl"))
+    run("inline", model.predict_proba, threads, seconds)
+    compiled = compile_model(model)
+    if compiled is not None:
+        run("compiled", compiled.predict_proba, threads, seconds)
+
+    backend = ProcessInferenceBackend(os.path.join(ROOT, "fire_model.pkl"), processes=max(1, (os.cpu_count() or 2) // 2))
+    try:
+        run("process", backend.predict_with_proba, threads, seconds)
+    finally:
+        backend.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 5.0)
@@ -0,0 +1,70 @@
+"""Time-to-first-byte, total time, size and peak Python memory of /download-report.
+
+Fills a scratch database with N synthetic readings (one per minute back
+from now), then drains the CSV report for each range and the full range in
+every export format, straight from the view, without a server or the test
+client's response buffering:
+
+    python benchmarks/bench_report_export.py [rows]
+"""
+import sys
+import time
+import tracemalloc
+import warnings
+
+import _scratch
+
+warnings.filterwarnings("ignore")
+
+
+def drain(app, view, url):
+    with app.test_request_context(url):
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = view()
+        if isinstance(response, tuple):
+            tracemalloc.stop()
+            return None
+        chunks = iter(response.response)
+        size = len(next(chunks))
+        first_byte = time.perf_counter() - start
+        for chunk in chunks:
+            size += len(chunk)
+        total = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return size, first_byte, total, peak
+
+
+def main(rows):
+    # A scratch database and export directory, so the real ones are left alone
+    with _scratch.scratch_database("bench-report-"):
+        import main as dashboard_main
+
+        db = dashboard_main.db
+        now = db.now_ms()
+        conn = db.get_connection()
+        with conn:
+            conn.executemany('''INSERT INTO sensor_readings
+                                (timestamp, fire, temperature, smoke, co, lpg, gas_value, pressure, aqi)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                             ((now - i * 60000, i % 97 == 0, 20 + i % 50, i % 400, 1.5, 2.0, i % 900, 1013.2, i % 300)
+                              for i in range(rows)))
+
+        runs = [(time_range, "csv") for time_range in ("today", "week")]
+        runs += [("all", export_format) for export_format in dashboard_main.reports.REPORT_FORMATS
+                 if export_format != "parquet" or dashboard_main.reports.parquet_available()]
+        for time_range, export_format in runs:
+            result = drain(dashboard_main.app, dashboard_main.download_report,
+                           f"/download-report?range={time_range}&format={export_format}")
+            label = f"{time_range} {export_format}"
+            if result is None:
+                print(f"{label:>12}: no rows")
+                continue
+            size, first_byte, total, peak = result
+            print(f"{label:>12}: {size / 1e6:8.1f} MB   first byte {first_byte * 1000:8.1f} ms   "
+                  f"total {total:7.2f} s   peak Python memory {peak / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
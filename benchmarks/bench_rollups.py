@@ -0,0 +1,85 @@
+"""Range summaries from the rollup tables vs. aggregating sensor_readings.
+
+Fills a scratch database with N synthetic readings (one every few seconds
+back from now), rebuilds the rollups with the backfill, then times
+rollups.summarize() against the equivalent raw SQL aggregate for several
+range lengths, plus the cost apply() adds to a 200-row ingest flush:
+
+    python benchmarks/bench_rollups.py [rows]
+"""
+import statistics
+import sys
+import time
+
+import _scratch
+
+STEP_MS = 3000
+FLUSH_ROWS = 200
+RANGES = (("1 hour", 3600 * 1000), ("6 hours", 6 * 3600 * 1000), ("1 day", 24 * 3600 * 1000),
+          ("7 days", 7 * 24 * 3600 * 1000), ("30 days", 30 * 24 * 3600 * 1000))
+
+
+def timed(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def raw_summary(conn, rollups, from_ms, to_ms):
+    aggregates = ", ".join(f"COUNT({m}), MIN({m}), MAX({m}), AVG({m})" for m in rollups.METRICS)
+    return conn.execute(f'''SELECT COUNT(*), SUM(fire != 0), {aggregates} FROM sensor_readings
+                            WHERE timestamp >= ? AND timestamp < ?''', (from_ms, to_ms)).fetchone()
+
+
+def main(rows):
+    # A scratch database, so the real one is left alone
+    with _scratch.scratch_database("bench-rollups-"):
+        import db
+        import ingest
+        import rollups
+
+        db.migrate()
+        conn = db.get_connection()
+        now = db.now_ms()
+        with conn:
+            conn.executemany(ingest.INSERT_SQL,
+                             ((now - i * STEP_MS, i % 97 == 0, 20 + i % 50, i % 400, 1.5, 2.0, i % 900, 1013.2, i % 300)
+                              for i in range(rows)))
+
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        rollups.backfill(conn)
+        conn.commit()
+        print(f"{rows} readings over {rows * STEP_MS / 86400000:.1f} days; "
+              f"backfill {time.perf_counter() - start:.2f} s")
+
+        for label, length in RANGES:
+            # Unaligned bounds, so the edges come from finer rollups and raw rows
+            to_ms = now - 12345
+            from_ms = to_ms - length
+            summary, rollup_time = timed(lambda: rollups.summarize(conn, from_ms, to_ms))
+            raw, raw_time = timed(lambda: raw_summary(conn, rollups, from_ms, to_ms))
+            assert summary["count"] == raw[0], (summary["count"], raw[0])
+            print(f"{label:>8}: {summary['count']:>8} readings   rollups {rollup_time * 1000:7.2f} ms "
+                  f"({summary['source']['rollup_rows']} buckets, {summary['source']['raw_rows']} raw)   "
+                  f"raw SQL {raw_time * 1000:8.2f} ms")
+
+        # Ingest cost: one flush-sized batch with and without the rollup upserts
+        batch = [(now + i, 0, 25.0, 10.0, 1.5, 2.0, 100, 1013.2, 50) for i in range(FLUSH_ROWS)]
+
+        def flush(with_rollups):
+            with conn:
+                conn.executemany(ingest.INSERT_SQL, batch)
+                if with_rollups:
+                    rollups.apply(conn, batch)
+
+        _, plain = timed(lambda: flush(False), repeat=20)
+        _, rolled = timed(lambda: flush(True), repeat=20)
+        print(f"{FLUSH_ROWS}-row ingest flush: {plain * 1000:.2f} ms plain, {rolled * 1000:.2f} ms with rollups")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,84 @@
+"""Cold-start cost of the dashboard: import time and time to first response.
+
+For lazy model loading (the default) and EAGER_MODEL_LOAD=1, reports:
+
+  * import:       wall time of `python -c "import main"` in a fresh interpreter
+  * first /status: process start until gunicorn answers GET /status
+  * first predict: process start until POST /sensor returns a model prediction
+
+Each run uses a scratch copy of the app (with a warm compiled-model cache,
+as after the first deploy), so the real database is left alone:
+
+    python benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import _scratch
+
+PORT = 8766
+
+
+def environment(eager):
+    return dict(os.environ, EAGER_MODEL_LOAD="1" if eager else "0", PYTHONWARNINGS="ignore")
+
+
+def time_import(workdir, eager):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=workdir, env=environment(eager),
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def wait_for(request, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.read()
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError(request.full_url)
+
+
+def time_first_responses(workdir, eager):
+    command = [sys.executable, "-m", "gunicorn", "main:app", "--worker-class", "gthread", "--threads", "4",
+               "--workers", "1", "--bind", f"127.0.0.1:{PORT}"]
+    start = time.perf_counter()
+    server = subprocess.Popen(command, cwd=workdir, env=environment(eager),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = start + 120
+        wait_for(urllib.request.Request(f"http://127.0.0.1:{PORT}/status"), deadline)
+        first_status = time.perf_counter() - start
+        body = json.dumps({"temperature": 40, "smoke": 120, "gas": 300}).encode()
+        reply = json.loads(wait_for(urllib.request.Request(f"http://127.0.0.1:{PORT}/sensor", data=body,
+                                                           headers={"Content-Type": "application/json"}),
+                                    deadline))
+        first_predict = time.perf_counter() - start
+        if reply.get("prediction") not in ("Fire Detected", "No Fire"):
+            raise RuntimeError(f"unexpected /sensor reply: {reply}")
+        return first_status, first_predict
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main(runs):
+    with _scratch.app_copy("bench-startup-") as workdir:
+        time_import(workdir, eager=True)  # warm the compiled-model cache and the OS page cache
+        for name, eager in (("eager (old)", True), ("lazy", False)):
+            imports = [time_import(workdir, eager) for _ in range(runs)]
+            responses = [time_first_responses(workdir, eager) for _ in range(runs)]
+            print(f"{name:>12}: import {statistics.median(imports) * 1000:7.0f} ms   "
+                  f"first /status {statistics.median(r[0] for r in responses) * 1000:7.0f} ms   "
+                  f"first prediction {statistics.median(r[1] for r in responses) * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,67 @@
+"""Requests/sec for the dashboard pages: render_template_string vs cached templates.
+
+"before" re-registers each page the old way, compiling its template source
+with render_template_string on every request; "after" is the app's own
+route, which compiles the template once and (for pages without per-request
+data) serves the rendered HTML from memory. Requests go through Flask's
+test client, so the numbers exclude network and server overhead:
+
+    python benchmarks/bench_templates.py [seconds]
+"""
+import sys
+import time
+import warnings
+
+import _scratch
+
+warnings.filterwarnings("ignore")
+
+
+def requests_per_second(client, path, seconds):
+    client.get(path)  # warm up (first compile)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        client.get(path)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main(seconds):
+    # Import from a scratch copy so the real database is left alone
+    with _scratch.app_copy("bench-templates-", importable=True):
+        import main as dashboard_main
+        from flask import render_template_string
+
+        app = dashboard_main.app
+
+        def index_before():
+            return render_template_string(dashboard_main.html_template,
+                                          fire=dashboard_main.fire_detected,
+                                          external_fire_alert=dashboard_main.is_external_alert_active(),
+                                          temperature=dashboard_main.temperature,
+                                          smoke=dashboard_main.smoke,
+                                          co=dashboard_main.co,
+                                          lpg=dashboard_main.lpg,
+                                          gasValue=dashboard_main.gasValue,
+                                          pressure=dashboard_main.pressure,
+                                          aqi=dashboard_main.aqi)
+
+        pages = [("/", index_before)]
+        for path, name in (("/about", "about_template"), ("/ai-dashboard", "ai_dashboard_template"),
+                           ("/features", "features_template")):
+            pages.append((path, lambda source=getattr(dashboard_main, name): render_template_string(source)))
+        for path, view in pages:
+            app.add_url_rule("/_before" + path, "before" + path, view)
+
+        client = app.test_client()
+        for path, _ in pages:
+            assert client.get("/_before" + path).data == client.get(path).data
+            before = requests_per_second(client, "/_before" + path, seconds)
+            after = requests_per_second(client, path, seconds)
+            print(f"{path:>14}: before {before:>8.0f} req/s   after {after:>8.0f} req/s   "
+                  f"speedup {after / before:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0)
@@ -0,0 +1,88 @@
+"""Per-worker memory of gunicorn with and without --preload / mmap'd models.
+
+Starts `gunicorn main:app` with N gthread workers twice (plain, and with
+--preload plus MODEL_MMAP=1 and EAGER_MODEL_LOAD=1), sends a few requests
+so every worker has served traffic, then reads /proc/<pid>/smaps_rollup
+for each worker.
+RSS counts shared pages in every process; PSS splits them between the
+processes sharing them, so the PSS total is what the host actually pays:
+
+    python benchmarks/bench_worker_memory.py [workers]
+
+Linux only.
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+import _scratch
+
+PORT = 8765
+
+
+def rollup(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def wait_ready(timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{PORT}/status", timeout=1).read()
+            return True
+        except OSError:
+            time.sleep(0.25)
+    return False
+
+
+def measure(name, workers, preload, mmap):
+    # Run from a scratch copy so the real database and model cache are left alone
+    with _scratch.app_copy("bench-memory-") as workdir:
+        # The preloaded master must load the model itself for the workers to share it
+        env = dict(os.environ, MODEL_MMAP="1" if mmap else "0", EAGER_MODEL_LOAD="1" if preload else "0",
+                   PYTHONWARNINGS="ignore")
+        command = [sys.executable, "-m", "gunicorn", "main:app", "--worker-class", "gthread", "--threads", "4",
+                   "--workers", str(workers), "--bind", f"127.0.0.1:{PORT}"]
+        if preload:
+            command.append("--preload")
+        master = subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+        try:
+            if not wait_ready():
+                print(f"{name}: gunicorn did not start")
+                return
+            for _ in range(workers * 8):
+                urllib.request.urlopen(f"http://127.0.0.1:{PORT}/fire-status", timeout=5).read()
+            time.sleep(1.0)
+            pids = children(master.pid)
+            stats = [rollup(pid) for pid in pids]
+            total = {key: sum(s.get(key, 0) for s in stats) for key in ("Rss", "Pss", "Private_Dirty")}
+            print(f"{name:>16}: {len(pids)} workers   per worker RSS {total['Rss'] / len(pids) / 1024:6.1f} MiB   "
+                  f"PSS {total['Pss'] / len(pids) / 1024:6.1f} MiB   private dirty "
+                  f"{total['Private_Dirty'] / len(pids) / 1024:6.1f} MiB   PSS total {total['Pss'] / 1024:7.1f} MiB")
+        finally:
+            master.send_signal(signal.SIGTERM)
+            master.wait(timeout=30)
+
+
+def main(workers):
+    measure("plain", workers, preload=False, mmap=False)
+    measure("preload + mmap", workers, preload=True, mmap=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
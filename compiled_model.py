@@ -0,0 +1,282 @@
+"""Flat-array NumPy evaluators for the fire model.
+
+compile_model() exports a fitted scikit-learn tree, forest or binary
+logistic regression into plain arrays; the returned object exposes the
+same predict/predict_proba/classes_/feature_names_in_ surface the app
+uses, without scikit-learn's per-call validation and joblib dispatch.
+
+verify() checks the compiled model against the original bit for bit;
+the app only switches to it when that check passes. Run this module to
+verify fire_model.pkl against the readings stored in sensor_data.db:
+
+    python compiled_model.py
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+class CompiledForest:
+    """All trees of a forest (or a single tree) laid out in shared flat arrays.
+
+    Node i of the combined layout tests `feature[i]` against `threshold[i]`
+    and continues at `left[i]` / `right[i]` (global indices, -1 at leaves);
+    `value[i]` holds the class probabilities of a leaf.
+    """
+
+    def __init__(self, trees, classes, feature_names=None, n_features=None):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            n_nodes = tree.node_count
+            left = tree.children_left.astype(np.int64)
+            right = tree.children_right.astype(np.int64)
+            is_leaf = left == -1
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(tree.threshold.astype(np.float64))
+            lefts.append(np.where(is_leaf, -1, left + offset))
+            rights.append(np.where(is_leaf, -1, right + offset))
+            values.append(tree.value[:, 0, :len(classes)].astype(np.float64))
+            offset += n_nodes
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.value = np.concatenate(values)
+        self.roots = np.array(roots, dtype=np.int64)
+        self.max_depth = max(int(tree.max_depth) for tree in trees)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = n_features
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    # Flat arrays written by save() and memory-mapped by load()
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots', 'classes_')
+
+    def save(self, directory):
+        """Write the flat arrays as .npy files so other processes can mmap them."""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, name + '.npy'), getattr(self, name), allow_pickle=False)
+        meta = {'max_depth': self.max_depth, 'n_features_in_': self.n_features_in_,
+                'feature_names_in_': [str(n) for n in getattr(self, 'feature_names_in_', [])] or None}
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """Inverse of save(); with mmap_mode='r' the arrays are read-only shared page-cache mappings."""
+        compiled = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(compiled, name, np.load(os.path.join(directory, name + '.npy'), mmap_mode=mmap_mode,
+                                            allow_pickle=False))
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        compiled.max_depth = meta['max_depth']
+        compiled.n_features_in_ = meta['n_features_in_']
+        if meta['feature_names_in_'] is not None:
+            compiled.feature_names_in_ = np.asarray(meta['feature_names_in_'], dtype=object)
+        return compiled
+
+    def apply(self, X):
+        """Leaf index reached in every tree: shape (n_trees, n_samples)."""
+        # scikit-learn evaluates trees on float32 inputs
+        columns = np.ascontiguousarray(np.asarray(X, dtype=np.float32).T)
+        n_samples = columns.shape[1]
+        node = np.repeat(self.roots[:, None], n_samples, axis=1)
+        samples = np.arange(n_samples)
+        for _ in range(self.max_depth):
+            left = self.left[node]
+            internal = left != -1
+            if not internal.any():
+                break
+            go_left = columns[self.feature[node], samples] <= self.threshold[node]
+            node = np.where(internal, np.where(go_left, left, self.right[node]), node)
+        return node
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        # Accumulate tree by tree, in estimator order, exactly like the forest does
+        proba = np.zeros((leaves.shape[1], self.value.shape[1]), dtype=np.float64)
+        for tree_leaves in leaves:
+            proba += self.value[tree_leaves]
+        if len(self.roots) > 1:
+            proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+class CompiledLogistic:
+    """Binary logistic regression as one coefficient vector and an intercept."""
+
+    def __init__(self, coef, intercept, classes, feature_names=None, n_features=None):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = n_features
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    def decision_function(self, X):
+        return (np.asarray(X, dtype=np.float64) @ self.coef.T + self.intercept).ravel()
+
+    def predict_proba(self, X):
+        from scipy.special import expit
+
+        positive = expit(self.decision_function(X))
+        return np.vstack([1 - positive, positive]).T
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+def compile_model(model):
+    """Export a supported scikit-learn model, or return None if the type is not supported."""
+    if model is None:
+        return None
+    name = type(model).__name__
+    feature_names = getattr(model, 'feature_names_in_', None)
+    n_features = getattr(model, 'n_features_in_', None)
+    try:
+        if name in ('RandomForestClassifier', 'ExtraTreesClassifier'):
+            if model.n_outputs_ != 1:
+                return None
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            return CompiledForest(trees, model.classes_, feature_names, n_features)
+        if name in ('DecisionTreeClassifier', 'ExtraTreeClassifier'):
+            if model.n_outputs_ != 1:
+                return None
+            return CompiledForest([model.tree_], model.classes_, feature_names, n_features)
+        if name == 'LogisticRegression' and len(model.classes_) == 2:
+            return CompiledLogistic(model.coef_, model.intercept_, model.classes_, feature_names, n_features)
+    except AttributeError:
+        return None
+    return None
+
+
+def verify(model, compiled, X):
+    """True if predict and predict_proba match the original bit for bit on X."""
+    X = np.asarray(X, dtype=np.float64)
+    if X.shape[0] == 0:
+        return False
+    expected_proba = np.asarray(model.predict_proba(X))
+    actual_proba = compiled.predict_proba(X)
+    if expected_proba.shape != actual_proba.shape or expected_proba.tobytes() != actual_proba.tobytes():
+        return False
+    return np.array_equal(np.asarray(model.predict(X)), compiled.predict(X))
+
+
+def verification_inputs(stored, n_features, synthetic=2000, seed=0):
+    """Stored feature rows plus a synthetic spread, so an empty database still gets checked."""
+    rng = np.random.default_rng(seed)
+    stored = np.asarray(stored, dtype=np.float64).reshape(-1, n_features)
+    low = np.zeros(n_features)
+    high = np.full(n_features, 1000.0)
+    if len(stored):
+        low = np.minimum(low, stored.min(axis=0))
+        high = np.maximum(high, stored.max(axis=0))
+    spread = rng.uniform(low, high, size=(synthetic, n_features))
+    return np.vstack([stored, spread])
+
+
+def stored_features(builder, limit=None):
+    """Feature rows for the readings in sensor_readings (most recent first when limited)."""
+    import db
+
+    sql = '''SELECT temperature, smoke, gas_value, co, lpg, pressure, aqi FROM sensor_readings ORDER BY id DESC'''
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    rows = db.get_connection().execute(sql).fetchall()
+    return builder.rows([{'temperature': r[0], 'smoke': r[1], 'gas': r[2], 'co': r[3], 'lpg': r[4],
+                          'pressure': r[5], 'aqi': r[6]} for r in rows])
+
+
+def compile_verified(model, builder, limit=5000):
+    """Compiled model if the type is supported and it matches `model` exactly, else None."""
+    compiled = compile_model(model)
+    if compiled is None:
+        return None
+    stored = stored_features(builder, limit)
+    if not verify(model, compiled, verification_inputs(stored, len(builder.feature_names))):
+        return None
+    return compiled
+
+
+def compile_cached(model, builder, model_path, limit=5000):
+    """compile_verified(), persisted next to the model file and memory-mapped back.
+
+    The cache lives in `<model_path>.compiled/` and is keyed by the model
+    file's size and mtime. Every gunicorn worker maps the same read-only
+    pages instead of holding a private copy of the arrays. Falls back to
+    the in-memory compiled model if the cache cannot be written.
+    """
+    stat = os.stat(model_path)
+    key = f"{stat.st_size}-{stat.st_mtime_ns}"
+    cache_dir = model_path + '.compiled'
+    key_path = os.path.join(cache_dir, 'key')
+
+    compiled = None
+    try:
+        with open(key_path) as f:
+            if f.read().strip() == key:
+                compiled = CompiledForest.load(cache_dir)
+    except (OSError, ValueError, KeyError):
+        compiled = None
+
+    if compiled is None:
+        compiled = compile_model(model)
+        if not isinstance(compiled, CompiledForest):
+            return compile_verified(model, builder, limit)
+        try:
+            # Write to a temporary directory and rename it into place atomically
+            parent = os.path.dirname(os.path.abspath(cache_dir))
+            staging = tempfile.mkdtemp(prefix='.compiled-', dir=parent)
+            compiled.save(staging)
+            with open(os.path.join(staging, 'key'), 'w') as f:
+                f.write(key)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            os.replace(staging, cache_dir)
+            compiled = CompiledForest.load(cache_dir)
+        except OSError as e:
+            print(f"⚠️ Could not cache compiled model in {cache_dir} - {e}")
+
+    stored = stored_features(builder, limit)
+    if not verify(model, compiled, verification_inputs(stored, len(builder.feature_names))):
+        return None
+    return compiled
+
+
+def main():
+    import warnings
+
+    import joblib
+
+    import db
+    from features import FeatureBuilder
+
+    warnings.filterwarnings("ignore")
+    model = joblib.load('fire_model.pkl')
+    compiled = compile_model(model)
+    if compiled is None:
+        print(f"Unsupported model type: {type(model).__name__}")
+        return 1
+
+    builder = FeatureBuilder.for_model(model)
+    db.migrate()
+    stored = stored_features(builder)
+    X = verification_inputs(stored, len(builder.feature_names))
+    ok = verify(model, compiled, X)
+    print(f"{type(model).__name__}: {len(stored)} stored readings + {len(X) - len(stored)} synthetic -> "
+          f"{'bit-for-bit equal' if ok else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
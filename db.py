@@ -0,0 +1,236 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import forks
+
+DB_PATH = os.environ.get("SENSOR_DB_PATH", "sensor_data.db")
+
+# Applied to every connection when it is opened
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", 5000),
+    ("mmap_size", 256 * 1024 * 1024),
+    ("cache_size", -64 * 1024),  # negative = KiB, so 64 MiB
+    ("temp_store", "MEMORY"),
+)
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _record(name, elapsed):
+    with _stats_lock:
+        entry = _stats.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        ms = elapsed * 1000.0
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        if ms > entry["max_ms"]:
+            entry["max_ms"] = ms
+
+
+class TimedCursor(sqlite3.Cursor):
+    """sqlite3 cursor that records time spent in execute/executemany."""
+
+    def execute(self, sql, *args):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, *args)
+        finally:
+            _record("execute", time.perf_counter() - start)
+
+    def executemany(self, sql, *args):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, *args)
+        finally:
+            _record("executemany", time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors and commits are timed."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, *args):
+        return self.cursor().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        return self.cursor().executemany(sql, *args)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            _record("commit", time.perf_counter() - start)
+
+
+def _open():
+    start = time.perf_counter()
+    conn = sqlite3.connect(DB_PATH, factory=TimedConnection)
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name}={value}")
+    _record("connect", time.perf_counter() - start)
+    return conn
+
+
+def get_connection():
+    """Return this thread's connection, opening it on first use.
+
+    Connections are reused for the lifetime of the thread and discarded
+    after a fork so gunicorn workers never share a handle with the master.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _record("reuse", 0.0)
+        return conn
+    conn = _open()
+    _local.conn = conn
+    return conn
+
+
+def close_connection():
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        conn.close()
+
+
+def _reset_after_fork():
+    # The child must not touch connections inherited from the parent
+    global _local
+    _local = threading.local()
+
+
+forks.after_fork(_reset_after_fork)
+
+
+def now_ms():
+    """Current time as integer epoch milliseconds, the storage format for timestamps."""
+    return time.time_ns() // 1_000_000
+
+
+def to_ms(dt):
+    """Convert a datetime (naive = local time) to epoch milliseconds."""
+    return int(dt.timestamp() * 1000)
+
+
+def format_ms(ms):
+    """Render stored epoch milliseconds as 'YYYY-MM-DD HH:MM:SS' in UTC."""
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _migration_1(conn):
+    # Original schema: no primary key, no index
+    conn.execute('''CREATE TABLE IF NOT EXISTS sensor_readings
+                    (timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                     fire BOOLEAN,
+                     temperature REAL,
+                     smoke REAL,
+                     co REAL,
+                     lpg REAL,
+                     gas_value INTEGER,
+                     pressure REAL,
+                     aqi INTEGER)''')
+
+
+def _migration_2(conn):
+    # Rebuild with an INTEGER PRIMARY KEY (rowid alias) and index the timestamp
+    conn.execute('''CREATE TABLE sensor_readings_new
+                    (id INTEGER PRIMARY KEY,
+                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                     fire BOOLEAN,
+                     temperature REAL,
+                     smoke REAL,
+                     co REAL,
+                     lpg REAL,
+                     gas_value INTEGER,
+                     pressure REAL,
+                     aqi INTEGER)''')
+    conn.execute('''INSERT INTO sensor_readings_new
+                    (timestamp, fire, temperature, smoke, co, lpg, gas_value, pressure, aqi)
+                    SELECT timestamp, fire, temperature, smoke, co, lpg, gas_value, pressure, aqi
+                    FROM sensor_readings ORDER BY rowid''')
+    conn.execute("DROP TABLE sensor_readings")
+    conn.execute("ALTER TABLE sensor_readings_new RENAME TO sensor_readings")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sensor_readings_timestamp ON sensor_readings (timestamp)")
+
+
+def _migration_3(conn):
+    # Store timestamps as integer epoch milliseconds (UTC) instead of DATETIME text
+    conn.execute('''CREATE TABLE sensor_readings_new
+                    (id INTEGER PRIMARY KEY,
+                     timestamp INTEGER NOT NULL
+                         DEFAULT (CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)),
+                     fire BOOLEAN,
+                     temperature REAL,
+                     smoke REAL,
+                     co REAL,
+                     lpg REAL,
+                     gas_value INTEGER,
+                     pressure REAL,
+                     aqi INTEGER)''')
+    conn.execute('''INSERT INTO sensor_readings_new
+                    (id, timestamp, fire, temperature, smoke, co, lpg, gas_value, pressure, aqi)
+                    SELECT id, CAST(strftime('%s', timestamp) AS INTEGER) * 1000,
+                           fire, temperature, smoke, co, lpg, gas_value, pressure, aqi
+                    FROM sensor_readings ORDER BY id''')
+    conn.execute("DROP TABLE sensor_readings")
+    conn.execute("ALTER TABLE sensor_readings_new RENAME TO sensor_readings")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sensor_readings_timestamp ON sensor_readings (timestamp)")
+
+
+def _migration_4(conn):
+    # Minute/hour/day rollups of sensor_readings, built from the rows already stored
+    import rollups
+    rollups.create_tables(conn)
+    rollups.backfill(conn)
+
+
+# Applied in order; the position in this list (1-based) is the schema version
+MIGRATIONS = [
+    _migration_1,
+    _migration_2,
+    _migration_3,
+    _migration_4,
+]
+
+
+def schema_version(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+    row = conn.execute("SELECT version FROM schema_version").fetchone()
+    return row[0] if row else 0
+
+
+def migrate(conn=None):
+    """Bring the database up to the latest schema version in place.
+
+    Runs under BEGIN IMMEDIATE so concurrently starting workers apply each
+    migration exactly once.
+    """
+    conn = conn or get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = schema_version(conn)
+        for version, migration in enumerate(MIGRATIONS[current:], start=current + 1):
+            print(f"🔧 Applying schema migration {version} ({migration.__name__})")
+            migration(conn)
+        if current < len(MIGRATIONS):
+            conn.execute("DELETE FROM schema_version")
+            conn.execute("INSERT INTO schema_version (version) VALUES (?)", (len(MIGRATIONS),))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(MIGRATIONS)
+
+
+def stats():
+    with _stats_lock:
+        return {name: dict(entry) for name, entry in _stats.items()}
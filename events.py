@@ -0,0 +1,37 @@
+import threading
+
+import forks
+
+# Change notifications for long-lived clients (the /stream endpoint).
+# Every ingest flush or alert change bumps a sequence number; waiters wake up
+# and re-read state instead of polling on a fixed interval.
+
+_cond = threading.Condition()
+_sequence = 0
+
+
+def notify():
+    """Record a state change and wake every waiting stream."""
+    global _sequence
+    with _cond:
+        _sequence += 1
+        _cond.notify_all()
+
+
+def sequence():
+    return _sequence
+
+
+def wait(last_seen, timeout):
+    """Block until the sequence moves past `last_seen` or `timeout` seconds pass."""
+    with _cond:
+        _cond.wait_for(lambda: _sequence != last_seen, timeout)
+        return _sequence
+
+
+def _reset_after_fork():
+    global _cond
+    _cond = threading.Condition()
+
+
+forks.after_fork(_reset_after_fork)
@@ -0,0 +1,227 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import forks
+import reports
+
+# Seconds between progress writes while a job runs
+PROGRESS_INTERVAL = 0.5
+
+
+class _CountingCursor:
+    """Cursor wrapper that reports how many rows the encoder has pulled so far."""
+
+    def __init__(self, cursor, on_rows):
+        self.cursor = cursor
+        self.on_rows = on_rows
+
+    def fetchmany(self, size):
+        rows = self.cursor.fetchmany(size)
+        if rows:
+            self.on_rows(len(rows))
+        return rows
+
+
+class ExportJobs:
+    """Report exports that run in a background thread and leave a file on disk.
+
+    Job state is a small JSON file under `<directory>/jobs/`, so whichever
+    gunicorn worker receives the poll or download can answer it; the job
+    itself runs in the worker that created it. Finished files are named
+    after the range bounds, format and ingest watermark (the latest
+    sensor_readings id when the job was created, which also caps the rows
+    it exports), so repeating an export before new data arrives reuses the
+    file instead of running again. The newest `keep` files per range and
+    format are kept; job records expire after `job_ttl` seconds.
+    """
+
+    def __init__(self, directory, workers=1, keep=3, job_ttl=24 * 3600):
+        self.directory = directory
+        self.workers = workers
+        self.keep = keep
+        self.job_ttl = job_ttl
+        self._lock = threading.Lock()
+        self._pool = None
+        # artifact name -> job id, for jobs queued or running in this process
+        self._active = {}
+        forks.after_fork(self._after_fork)
+
+    def _after_fork(self):
+        # Jobs queued or running before the fork finish in the parent
+        self._lock = threading.Lock()
+        self._pool = None
+        self._active = {}
+
+    # Files
+
+    def _jobs_dir(self):
+        return os.path.join(self.directory, 'jobs')
+
+    def _job_path(self, job_id):
+        return os.path.join(self._jobs_dir(), job_id + '.json')
+
+    def artifact_path(self, job):
+        return os.path.join(self.directory, job['artifact'])
+
+    def _write_json(self, path, data):
+        fd, staging = tempfile.mkstemp(prefix='.job-', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(staging, path)
+
+    def _save(self, job):
+        self._write_json(self._job_path(job['id']), job)
+
+    def get(self, job_id):
+        if not re.fullmatch(r'[0-9a-f]{32}', job_id or ''):
+            return None
+        try:
+            with open(self._job_path(job_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # Jobs
+
+    def create(self, time_range, export_format):
+        """Start (or reuse) an export; returns the job record."""
+        os.makedirs(self._jobs_dir(), exist_ok=True)
+        self._prune_jobs()
+
+        # The range is part of the file name; anything unrecognised exports all data, as /download-report does
+        if time_range not in ('today', 'week'):
+            time_range = 'all'
+        from_ms, to_ms = reports.report_bounds(time_range)
+        if time_range == 'week':
+            # Minute granularity so repeated requests can share a file
+            from_ms -= from_ms % 60000
+        watermark = db.get_connection().execute('SELECT MAX(id) FROM sensor_readings').fetchone()[0] or 0
+        _, extension = reports.REPORT_FORMATS[export_format]
+        key = f"{time_range}-{from_ms or 0}-{to_ms or 0}-{watermark}"
+        now = db.now_ms()
+        job = {
+            'id': uuid.uuid4().hex,
+            'range': time_range,
+            'format': export_format,
+            'status': 'queued',
+            'from_ms': from_ms,
+            'to_ms': to_ms,
+            'watermark': watermark,
+            'rows': 0,
+            'total': None,
+            'cached': False,
+            'created': now,
+            'finished': None,
+            'error': None,
+            'artifact': f"{key}.{extension}",
+            'filename': f"fire_detection_report_{time_range}_{time.strftime('%Y%m%d')}.{extension}",
+        }
+
+        meta = self._artifact_meta(job['artifact'])
+        if meta is not None:
+            job.update(status='done', cached=True, rows=meta['rows'], total=meta['rows'], finished=now)
+            self._save(job)
+            return job
+
+        with self._lock:
+            pool = self._get_pool()
+            running = self.get(self._active.get(job['artifact']))
+            if running is not None and running['status'] in ('queued', 'running'):
+                return running
+            self._active[job['artifact']] = job['id']
+            self._save(job)
+            pool.submit(self._run, job)
+        return job
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export")
+        return self._pool
+
+    def _artifact_meta(self, artifact):
+        try:
+            with open(os.path.join(self.directory, artifact + '.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if os.path.exists(os.path.join(self.directory, artifact)) else None
+
+    def _run(self, job):
+        staging = None
+        cursor = None
+        try:
+            job['status'] = 'running'
+            self._save(job)
+            conn = db.get_connection()
+            bounds = (job['from_ms'], job['to_ms'], job['watermark'])
+            job['total'] = conn.execute(*reports.report_query(*bounds, columns='COUNT(*)')).fetchone()[0]
+            self._save(job)
+
+            last_save = [time.monotonic()]
+
+            def on_rows(count):
+                job['rows'] += count
+                if time.monotonic() - last_save[0] >= PROGRESS_INTERVAL:
+                    last_save[0] = time.monotonic()
+                    self._save(job)
+
+            cursor = conn.execute(*reports.report_query(*bounds))
+            fd, staging = tempfile.mkstemp(prefix='.export-', dir=self.directory)
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in reports.ENCODERS[job['format']]([], _CountingCursor(cursor, on_rows)):
+                    f.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            os.replace(staging, self.artifact_path(job))
+            staging = None
+            self._write_json(self.artifact_path(job) + '.json', {'rows': job['rows'], 'job': job['id']})
+
+            job.update(status='done', finished=db.now_ms())
+            self._save(job)
+            print(f"📦 Export {job['id']} finished: {job['rows']} rows -> {job['artifact']}")
+            self._prune_artifacts(job)
+        except Exception as e:
+            print(f"❌ Export {job['id']} failed - {e}")
+            job.update(status='failed', error=str(e), finished=db.now_ms())
+            self._save(job)
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if staging is not None:
+                try:
+                    os.remove(staging)
+                except OSError:
+                    pass
+            with self._lock:
+                self._active.pop(job['artifact'], None)
+
+    # Cleanup
+
+    def _prune_artifacts(self, job):
+        """Keep the newest `keep` files for this range and format."""
+        prefix = job['range'] + '-'
+        suffix = '.' + job['artifact'].split('.', 1)[1]
+        names = [name for name in os.listdir(self.directory)
+                 if name.startswith(prefix) and name.endswith(suffix)]
+        names.sort(key=lambda name: os.path.getmtime(os.path.join(self.directory, name)), reverse=True)
+        for name in names[self.keep:]:
+            for path in (os.path.join(self.directory, name), os.path.join(self.directory, name + '.json')):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _prune_jobs(self):
+        cutoff = time.time() - self.job_ttl
+        for name in os.listdir(self._jobs_dir()):
+            path = os.path.join(self._jobs_dir(), name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
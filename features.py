@@ -0,0 +1,52 @@
+import numpy as np
+
+# Feature columns assumed when the model does not record its own names
+# (the order /sensor and /fire-status have always used)
+DEFAULT_FEATURES = ('temperature', 'smoke', 'gas')
+
+# Model feature name -> reading keys to look it up under, in order of preference
+FEATURE_ALIASES = {
+    'temperature': ('temperature', 'temp'),
+    'temp': ('temp', 'temperature'),
+    'gas': ('gas', 'gasValue'),
+    'gasValue': ('gasValue', 'gas'),
+}
+
+
+class FeatureBuilder:
+    """Builds model input arrays straight from reading dicts.
+
+    The column order is resolved once from the model's `feature_names_in_`
+    at load time, so each prediction only costs a list comprehension and an
+    ndarray allocation instead of a pandas DataFrame.
+    """
+
+    def __init__(self, feature_names):
+        self.feature_names = tuple(feature_names)
+        self._keys = [FEATURE_ALIASES.get(name, (name,)) for name in self.feature_names]
+
+    @classmethod
+    def for_model(cls, model):
+        names = getattr(model, 'feature_names_in_', None)
+        if names is None:
+            names = DEFAULT_FEATURES[:getattr(model, 'n_features_in_', len(DEFAULT_FEATURES))]
+        return cls([str(name) for name in names])
+
+    def _values(self, reading):
+        values = []
+        for keys in self._keys:
+            value = None
+            for key in keys:
+                value = reading.get(key)
+                if value is not None:
+                    break
+            values.append(0.0 if value is None else value)
+        return values
+
+    def row(self, reading):
+        """(1, n_features) float array for a single reading."""
+        return np.array([self._values(reading)], dtype=np.float64)
+
+    def rows(self, readings):
+        """(len(readings), n_features) float array for a batch of readings."""
+        return np.array([self._values(reading) for reading in readings], dtype=np.float64).reshape(-1, len(self._keys))
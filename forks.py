@@ -0,0 +1,23 @@
+import os
+import weakref
+
+# Threads, pools and locks do not survive a fork (gunicorn --preload forks every
+# worker from the master), so objects that own them register a reset that runs
+# in the child and recreate them lazily on first use.
+
+
+def after_fork(callback):
+    """Run `callback()` in the child after every fork; bound methods are held weakly."""
+    if not hasattr(os, "register_at_fork"):
+        return
+    if not hasattr(callback, "__self__"):
+        os.register_at_fork(after_in_child=callback)
+        return
+    method = weakref.WeakMethod(callback)
+
+    def run():
+        bound = method()
+        if bound is not None:
+            bound()
+
+    os.register_at_fork(after_in_child=run)
@@ -0,0 +1,101 @@
+# Builders for the historical-data payload served by GET /update.
+# Rows are (timestamp, fire, temperature, smoke, co, lpg, gas_value, pressure, aqi).
+import numpy as np
+
+# Response key -> column index in a history row
+HISTORY_METRICS = (
+    ("temp", 2),
+    ("smoke", 3),
+    ("co", 4),
+    ("lpg", 5),
+    ("gasValue", 6),
+    ("pressure", 7),
+)
+
+
+def build_history_rows(history):
+    """Original shape: one list of {"timestamp", "value"} dicts per metric."""
+    return {key: [{"timestamp": row[0], "value": row[index]} for row in history]
+            for key, index in HISTORY_METRICS}
+
+
+def build_history_columnar(history):
+    """Columnar shape: one shared timestamps array plus one array per metric.
+
+    The rows are transposed once, so each timestamp is serialized a single
+    time instead of once per metric.
+    """
+    if not history:
+        columns = [[] for _ in range(9)]
+    else:
+        columns = [list(column) for column in zip(*history)]
+    data = {"timestamps": columns[0]}
+    for key, index in HISTORY_METRICS:
+        data[key] = columns[index]
+    return data
+
+
+def lttb_indices(x, y, points):
+    """Largest-Triangle-Three-Buckets: indices of `points` samples that keep the shape of y(x).
+
+    The first and last samples are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the average of the next bucket.
+    """
+    length = len(x)
+    if points >= length or points < 3:
+        return np.arange(length)
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+
+    every = (length - 2) / (points - 2)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(points - 2):
+        avg_start = int(np.floor((i + 1) * every)) + 1
+        avg_end = min(int(np.floor((i + 2) * every)) + 1, length)
+        avg_x = x[avg_start:avg_end].mean()
+        avg_y = y[avg_start:avg_end].mean()
+
+        range_start = int(np.floor(i * every)) + 1
+        range_end = int(np.floor((i + 1) * every)) + 1
+        area = np.abs((x[a] - avg_x) * (y[range_start:range_end] - y[a])
+                      - (x[a] - x[range_start:range_end]) * (avg_y - y[a]))
+        a = range_start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[points - 1] = length - 1
+    return selected
+
+
+def _column(history, index):
+    return np.array([np.nan if row[index] is None else row[index] for row in history], dtype=float)
+
+
+def downsample_history_rows(history, points):
+    """Row-of-dicts shape with each metric reduced to at most `points` samples."""
+    x = [row[0] for row in history]
+    data = {}
+    for key, index in HISTORY_METRICS:
+        keep = lttb_indices(x, _column(history, index), points)
+        data[key] = [{"timestamp": history[i][0], "value": history[i][index]} for i in keep]
+    return data
+
+
+def downsample_history_columnar(history, points):
+    """Columnar shape over at most `points` rows, shared by every metric.
+
+    Each metric gets an LTTB budget of (points - 2) // len(HISTORY_METRICS) + 2
+    samples; the first and last rows are in every metric's selection, so
+    the union of the selections never exceeds `points` rows. Budgets below
+    three (points < 8) select on the first metric alone.
+    """
+    x = [row[0] for row in history]
+    budget = (points - 2) // len(HISTORY_METRICS) + 2
+    if budget < 3:
+        keep = set(lttb_indices(x, _column(history, HISTORY_METRICS[0][1]), points).tolist())
+    else:
+        keep = set()
+        for key, index in HISTORY_METRICS:
+            keep.update(lttb_indices(x, _column(history, index), budget).tolist())
+    return build_history_columnar([history[i] for i in sorted(keep)])
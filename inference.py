@@ -0,0 +1,275 @@
+import atexit
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import forks
+
+
+class InferenceScheduler:
+    """Coalesces concurrent prediction requests into batched model calls.
+
+    Callers submit feature rows and get a Future back. A background thread
+    waits up to `window_ms` after the first request (or until `max_batch`
+    rows are queued), runs one predict/predict_proba over the stacked rows
+    and hands every caller its own slice of the result.
+    """
+
+    def __init__(self, model_getter, window_ms=2.0, max_batch=64):
+        self.model_getter = model_getter
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        forks.after_fork(self._after_fork)
+        # Called as hook(model, X, predictions, model_ms) after every batch
+        self.hooks = []
+        self.stats = {"requests": 0, "rows": 0, "batches": 0, "errors": 0, "max_batch_rows": 0,
+                      "wait_ms_total": 0.0, "model_ms_total": 0.0}
+
+    def submit(self, X):
+        """Queue a (n_rows, n_features) array; the Future resolves to (predictions, probabilities)."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        future = Future()
+        if self.window_ms <= 0:
+            # Scheduling disabled: run inline on the caller's thread
+            self._run([(X, future, time.perf_counter())])
+            return future
+        self._ensure_started()
+        self._queue.put((X, future, time.perf_counter()))
+        return future
+
+    def predict(self, X, timeout=10.0):
+        """Blocking submit(): returns (predictions, probabilities or None) for the rows of X."""
+        return self.submit(X).result(timeout)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        batches = stats["batches"] or 1
+        requests = stats["requests"] or 1
+        stats["avg_batch_rows"] = stats["rows"] / batches
+        stats["avg_requests_per_batch"] = stats["requests"] / batches
+        stats["avg_wait_ms"] = stats.pop("wait_ms_total") / requests
+        stats["avg_model_ms"] = stats.pop("model_ms_total") / batches
+        stats["window_ms"] = self.window_ms
+        stats["max_batch"] = self.max_batch
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name="inference-scheduler", daemon=True)
+            self._thread.start()
+
+    def _after_fork(self):
+        # Requests queued before the fork belong to the parent's scheduler thread
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            rows = len(first[0])
+            deadline = time.perf_counter() + self.window_ms / 1000.0
+            while rows < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._run(batch)
+
+    def _run(self, batch):
+        model = self.model_getter()
+        X = batch[0][0] if len(batch) == 1 else np.vstack([item[0] for item in batch])
+        start = time.perf_counter()
+        if hasattr(model, 'submit_batch'):
+            # Out-of-process backend: hand the batch over and go back to collecting the next one,
+            # so several batches can be in flight; callers are resolved when the pool answers
+            try:
+                pending = model.submit_batch(X)
+            except Exception as e:
+                self._fail(batch, e)
+                return
+            pending.add_done_callback(lambda done: self._complete(batch, model, X, start, done))
+            return
+        try:
+            if hasattr(model, 'predict_with_proba'):
+                predictions, probabilities = model.predict_with_proba(X)
+            else:
+                predictions = np.asarray(model.predict(X))
+                probabilities = np.asarray(model.predict_proba(X)) if hasattr(model, 'predict_proba') else None
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        self._finish(batch, model, X, start, predictions, probabilities)
+
+    def _complete(self, batch, model, X, start, pending):
+        try:
+            predictions, probabilities = pending.result()
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        self._finish(batch, model, X, start, predictions, probabilities)
+
+    def _fail(self, batch, error):
+        with self._lock:
+            self.stats["errors"] += 1
+        for _, future, _ in batch:
+            future.set_exception(error)
+
+    def _finish(self, batch, model, X, start, predictions, probabilities):
+        done = time.perf_counter()
+
+        offset = 0
+        wait_ms = 0.0
+        for rows, future, submitted in batch:
+            end = offset + len(rows)
+            future.set_result((predictions[offset:end],
+                               None if probabilities is None else probabilities[offset:end]))
+            wait_ms += (done - submitted) * 1000.0
+            offset = end
+
+        with self._lock:
+            self.stats["requests"] += len(batch)
+            self.stats["rows"] += len(X)
+            self.stats["batches"] += 1
+            self.stats["max_batch_rows"] = max(self.stats["max_batch_rows"], len(X))
+            self.stats["wait_ms_total"] += wait_ms
+            self.stats["model_ms_total"] += (done - start) * 1000.0
+
+        for hook in self.hooks:
+            try:
+                hook(model, X, predictions, (done - start) * 1000.0)
+            except Exception as e:
+                print(f"❌ Inference hook error: {e}")
+
+
+# Model loaded by each inference worker process (see ProcessInferenceBackend)
+_worker_model = None
+
+
+def _init_worker(model_path):
+    global _worker_model
+    import warnings
+
+    import joblib
+
+    from compiled_model import compile_model, verification_inputs, verify
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    model = joblib.load(model_path)
+    compiled = compile_model(model)
+    n_features = getattr(model, 'n_features_in_', None)
+    if compiled is not None and n_features and verify(model, compiled, verification_inputs([], n_features)):
+        model = compiled
+    _worker_model = model
+
+
+def _predict_in_worker(X):
+    predictions = np.asarray(_worker_model.predict(X))
+    probabilities = np.asarray(_worker_model.predict_proba(X)) if hasattr(_worker_model, 'predict_proba') else None
+    return predictions, probabilities
+
+
+class ProcessInferenceBackend:
+    """Runs the model in a pool of separate processes so inference never holds the web workers' GIL.
+
+    Every pool process loads `model_path` once. The pool is created lazily
+    in the process that first predicts, so each gunicorn worker gets its own,
+    and replaced if a crashed child breaks it. submit_batch() does not
+    block, so the scheduler can keep `processes` batches in flight.
+    """
+
+    def __init__(self, model_path, processes=1, timeout=10.0):
+        self.model_path = model_path
+        self.processes = processes
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.Lock()
+        forks.after_fork(self._after_fork)
+        atexit.register(self.shutdown)
+
+    def _get_pool(self):
+        pool = self._pool
+        if pool is not None:
+            return pool
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the web worker is multi-threaded
+                self._pool = ProcessPoolExecutor(max_workers=self.processes,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker, initargs=(self.model_path,))
+            return self._pool
+
+    def _after_fork(self):
+        # The pool's processes and management thread belong to the parent
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def submit_batch(self, X):
+        """Start predicting X in the pool; the Future resolves to (predictions, probabilities)."""
+        X = np.asarray(X, dtype=np.float64)
+        pool = self._get_pool()
+        try:
+            future = pool.submit(_predict_in_worker, X)
+        except BrokenProcessPool:
+            self._discard(pool)
+            pool = self._get_pool()
+            future = pool.submit(_predict_in_worker, X)
+        future.add_done_callback(lambda done: self._check_broken(pool, done))
+        return future
+
+    def _check_broken(self, pool, future):
+        # A crashed child breaks the whole pool; replace it so later batches get a fresh one
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(pool)
+
+    def _discard(self, pool):
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        print("❌ Inference process pool broke; starting a new one")
+        pool.shutdown(wait=False)
+
+    def predict_with_proba(self, X):
+        return self.submit_batch(X).result(self.timeout)
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+    def predict_proba(self, X):
+        return self.predict_with_proba(X)[1]
+
+    def reload(self, model_path):
+        """Serve a different model file; the old pool finishes its queued work and exits."""
+        with self._lock:
+            self.model_path = model_path
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
@@ -0,0 +1,172 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+import db
+import forks
+import rollups
+
+INSERT_SQL = '''INSERT INTO sensor_readings
+                (timestamp, fire, temperature, smoke, co, lpg, gas_value, pressure, aqi)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
+
+class IngestBuffer:
+    """Write-behind buffer that group-commits readings to sensor_readings.
+
+    Handlers call enqueue() and return immediately; a background thread
+    drains the bounded queue and flushes every `flush_rows` rows or every
+    `flush_ms` milliseconds, whichever comes first. Callables in `listeners`
+    are invoked with the rows after each successful commit.
+    """
+
+    def __init__(self, max_queue=10000, flush_rows=200, flush_ms=250):
+        self.flush_rows = flush_rows
+        self.flush_ms = flush_ms
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.stats = {"queued": 0, "flushed": 0, "dropped": 0, "commits": 0, "errors": 0}
+        self.listeners = []
+        forks.after_fork(self._after_fork)
+
+    def enqueue(self, row):
+        """Queue one row of INSERT_SQL parameters. Returns False if it was dropped.
+
+        The row carries its own timestamp (see db.now_ms) so flush latency
+        does not shift when the reading was taken.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+            return False
+        with self._lock:
+            self.stats["queued"] += 1
+        return True
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["pending"] = self.pending()
+        stats["flush_rows"] = self.flush_rows
+        stats["flush_ms"] = self.flush_ms
+        return stats
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+            self._thread.start()
+
+    def _after_fork(self):
+        # Rows queued before the fork are the parent's to write
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _drain(self):
+        rows = []
+        while len(rows) < self.flush_rows:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _commit(self, rows):
+        conn = db.get_connection()
+        with conn:
+            conn.executemany(INSERT_SQL, rows)
+            rollups.apply(conn, rows)
+        with self._lock:
+            self.stats["commits"] += 1
+
+    def _write(self, rows):
+        if not rows:
+            return
+        try:
+            self._commit(rows)
+            written = rows
+        except Exception as e:
+            print(f"❌ Ingest flush error: {e}")
+            if len(rows) == 1:
+                self._drop(rows[0])
+                return
+            # Handlers have already answered for these rows, so one bad row must not take
+            # the rest of the group down with it: retry them one transaction each
+            written = []
+            for row in rows:
+                try:
+                    self._commit([row])
+                except Exception as e:
+                    print(f"❌ Ingest row error: {e}")
+                    self._drop(row)
+                else:
+                    written.append(row)
+            if not written:
+                return
+        with self._lock:
+            self.stats["flushed"] += len(written)
+        for listener in self.listeners:
+            listener(written)
+
+    def _drop(self, row):
+        print(f"❌ Dropped ingest row: {row!r}")
+        with self._lock:
+            self.stats["errors"] += 1
+            self.stats["dropped"] += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            deadline = time.monotonic() + self.flush_ms / 1000.0
+            rows = []
+            while len(rows) < self.flush_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+                if self._stop.is_set():
+                    break
+            self._write(rows)
+        self.flush()
+
+    def flush(self):
+        """Write everything still queued. Safe to call from any thread."""
+        while True:
+            rows = self._drain()
+            if not rows:
+                return
+            self._write(rows)
+
+    def shutdown(self, timeout=5.0):
+        """Stop the writer thread and flush remaining rows (registered with atexit)."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+
+buffer = IngestBuffer(
+    max_queue=int(os.environ.get("INGEST_QUEUE_SIZE", 10000)),
+    flush_rows=int(os.environ.get("INGEST_FLUSH_ROWS", 200)),
+    flush_ms=int(os.environ.get("INGEST_FLUSH_MS", 250)),
+)
+atexit.register(buffer.shutdown)
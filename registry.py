@@ -0,0 +1,251 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import forks
+from compiled_model import compile_cached, compile_verified
+from features import FeatureBuilder
+
+# Shadow batches allowed to queue before new ones are skipped
+MAX_SHADOW_BACKLOG = 100
+
+
+class ModelVersion:
+    """One loaded model file: the fitted estimator and what is actually served."""
+
+    def __init__(self, name, path, mtime, model, served):
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        self.model = model
+        self.served = served
+        self.feature_names = FeatureBuilder.for_model(model).feature_names
+        # Shadow only: indices that reorder the active model's input columns into this model's order
+        self.columns = None
+
+
+class ModelRegistry:
+    """Loads fire models from a directory, hot-swaps them and scores a shadow model.
+
+    The served version is the file named in `<models_dir>/ACTIVE`, or else
+    the newest *.pkl; `<models_dir>/SHADOW` optionally names a candidate
+    that is scored on the same batches without affecting responses. When
+    the directory has no models, `fallback_path` is served. A background
+    thread re-checks the directory every `poll_seconds`; a new version is
+    fully loaded and verified before the single `active` reference is
+    swapped, so in-flight requests finish on the model they started with.
+    """
+
+    def __init__(self, models_dir, fallback_path, poll_seconds=5.0, compile=True, mmap=True):
+        self.models_dir = models_dir
+        self.fallback_path = fallback_path
+        self.poll_seconds = poll_seconds
+        self.compile = compile
+        self.mmap = mmap
+        self.active = None
+        self.shadow = None
+        self.listeners = []
+        self._signature = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self._thread = None
+        self._shadow_pool = None
+        self._shadow_pending = 0
+        forks.after_fork(self._after_fork)
+
+    def _after_fork(self):
+        # The watcher thread and shadow pool stay in the parent; start() and after_batch() recreate them
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread = None
+        self._shadow_pool = None
+        self._shadow_pending = 0
+
+    # Loading
+
+    def _load(self, path):
+        import joblib
+
+        # mmap_mode='r' maps the pickle's numpy arrays read-only instead of copying them
+        model = joblib.load(path, mmap_mode='r' if self.mmap else None)
+        served = model
+        if self.compile:
+            try:
+                builder = FeatureBuilder.for_model(model)
+                if self.mmap:
+                    served = compile_cached(model, builder, path) or model
+                else:
+                    served = compile_verified(model, builder) or model
+            except Exception as e:
+                print(f"⚠️ Could not compile {path} - {e}")
+        return ModelVersion(os.path.basename(path), path, os.path.getmtime(path), model, served)
+
+    def _load_shadow(self, path):
+        """Load a shadow version, or None if the active model's input rows lack one of its features."""
+        shadow = self._load(path)
+        names = list(self.active.feature_names)
+        missing = [name for name in shadow.feature_names if name not in names]
+        if missing:
+            print(f"⚠️ Not shadow scoring {shadow.name}: features {missing} are not in {self.active.feature_names}")
+            return None
+        if shadow.feature_names != self.active.feature_names:
+            # Batches are built in the active model's column order
+            shadow.columns = [names.index(name) for name in shadow.feature_names]
+        return shadow
+
+    def _pointer(self, name):
+        try:
+            with open(os.path.join(self.models_dir, name)) as f:
+                target = f.read().strip()
+        except OSError:
+            return None
+        return os.path.join(self.models_dir, target) if target else None
+
+    def _candidates(self):
+        """(active path, shadow path) from the directory, before any loading."""
+        try:
+            files = [os.path.join(self.models_dir, name) for name in os.listdir(self.models_dir)
+                     if name.endswith('.pkl')]
+        except OSError:
+            files = []
+        active = self._pointer('ACTIVE')
+        if active is None or not os.path.exists(active):
+            active = max(files, key=os.path.getmtime) if files else self.fallback_path
+        shadow = self._pointer('SHADOW')
+        if shadow is not None and (not os.path.exists(shadow) or shadow == active):
+            shadow = None
+        return active, shadow
+
+    def _directory_signature(self):
+        active, shadow = self._candidates()
+        signature = []
+        for path in (active, shadow):
+            try:
+                signature.append((path, os.path.getmtime(path)))
+            except (OSError, TypeError):
+                signature.append((path, None))
+        return tuple(signature)
+
+    def load_initial(self):
+        """Load the active (and shadow) version synchronously at startup."""
+        with self._lock:
+            self._signature = self._directory_signature()
+            active_path, shadow_path = self._candidates()
+            self.active = self._load(active_path)
+            self.shadow = self._load_shadow(shadow_path) if shadow_path else None
+            return self.active
+
+    def check(self):
+        """Reload if ACTIVE/SHADOW or the model files changed. Returns True on a swap."""
+        signature = self._directory_signature()
+        if signature == self._signature:
+            return False
+        with self._lock:
+            if signature == self._signature:
+                return False
+            active_path, shadow_path = self._candidates()
+            swapped = False
+            try:
+                if self.active is None or active_path != self.active.path or \
+                        os.path.getmtime(active_path) != self.active.mtime:
+                    candidate = self._load(active_path)
+                    if self.active is not None and candidate.feature_names != self.active.feature_names:
+                        print(f"⚠️ Not hot-swapping {candidate.name}: features {candidate.feature_names} "
+                              f"differ from {self.active.feature_names}; restart to switch")
+                    else:
+                        self.active = candidate
+                        swapped = True
+                        print(f"🔁 Now serving model {candidate.name}")
+                if shadow_path is None:
+                    self.shadow = None
+                elif self.shadow is None or shadow_path != self.shadow.path or \
+                        os.path.getmtime(shadow_path) != self.shadow.mtime:
+                    self.shadow = self._load_shadow(shadow_path)
+                    if self.shadow is not None:
+                        print(f"👥 Shadow scoring model {self.shadow.name}")
+            except Exception as e:
+                print(f"❌ Model reload failed - {e}")
+            self._signature = signature
+        if swapped:
+            for listener in self.listeners:
+                listener(self.active)
+        return swapped
+
+    def start(self):
+        """Start the directory watcher in this process (again after a fork)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+        self._thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"❌ Model registry check failed - {e}")
+
+    # Scoring
+
+    def _record(self, name, rows, elapsed_ms, agreed=None):
+        with self._stats_lock:
+            entry = self._stats.setdefault(name, {"batches": 0, "rows": 0, "total_ms": 0.0, "agreed": 0,
+                                                  "compared": 0})
+            entry["batches"] += 1
+            entry["rows"] += rows
+            entry["total_ms"] += elapsed_ms
+            if agreed is not None:
+                entry["agreed"] += agreed
+                entry["compared"] += rows
+
+    def after_batch(self, served, X, predictions, elapsed_ms):
+        """Scheduler hook: record the served batch and score the shadow on the same rows."""
+        active = self.active
+        self._record(active.name if active is not None else 'none', len(X), elapsed_ms)
+        shadow = self.shadow
+        if shadow is None:
+            return
+        if self._shadow_pool is None:
+            self._shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow-model")
+        # A slow shadow must never build an unbounded backlog; skipped batches are counted
+        with self._stats_lock:
+            if self._shadow_pending >= MAX_SHADOW_BACKLOG:
+                self._stats.setdefault(shadow.name, {"batches": 0, "rows": 0, "total_ms": 0.0, "agreed": 0,
+                                                     "compared": 0}).setdefault("skipped", 0)
+                self._stats[shadow.name]["skipped"] += 1
+                return
+            self._shadow_pending += 1
+        self._shadow_pool.submit(self._score_shadow, shadow, np.array(X, copy=True), np.asarray(predictions))
+
+    def _score_shadow(self, shadow, X, served_predictions):
+        if shadow.columns is not None:
+            X = X[:, shadow.columns]
+        start = time.perf_counter()
+        try:
+            predictions = np.asarray(shadow.served.predict(X))
+        except Exception as e:
+            print(f"❌ Shadow model {shadow.name} failed - {e}")
+            return
+        finally:
+            with self._stats_lock:
+                self._shadow_pending -= 1
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self._record(shadow.name, len(X), elapsed_ms, agreed=int(np.sum(predictions == served_predictions)))
+
+    def snapshot(self):
+        with self._stats_lock:
+            versions = {name: dict(entry) for name, entry in self._stats.items()}
+        for entry in versions.values():
+            entry["avg_ms"] = entry["total_ms"] / entry["batches"] if entry["batches"] else 0.0
+            entry["agreement_rate"] = entry["agreed"] / entry["compared"] if entry["compared"] else None
+        return {
+            "active": self.active.name if self.active else None,
+            "shadow": self.shadow.name if self.shadow else None,
+            "models_dir": self.models_dir,
+            "versions": versions,
+        }
@@ -0,0 +1,182 @@
+"""Streaming encoders for /download-report.
+
+Every encoder takes the rows already fetched (`first`) plus the open
+sensor_readings cursor, pulls the rest with fetchmany() and yields bytes or
+str chunks, so an export never holds more than one batch in memory. Rows
+are (timestamp ms, fire, temperature, smoke, co, lpg, gas_value,
+pressure, aqi), as selected by download_report().
+"""
+import json
+import zlib
+from datetime import datetime, timedelta
+
+import db
+
+# Rows fetched from SQLite per chunk (CSV/NDJSON) and per Parquet row group
+REPORT_BATCH_ROWS = 1000
+PARQUET_ROW_GROUP_ROWS = 65536
+
+REPORT_COLUMNS = ('timestamp', 'fire', 'temperature', 'smoke', 'co', 'lpg', 'gas_value', 'pressure', 'aqi')
+
+REPORT_HEADER = "Timestamp,Fire Status,Temperature (°C),Smoke (ppm),CO (ppm),LPG (ppm),Gas Value,Pressure (hPa),AQI\n"
+
+# format= value -> (mimetype, file extension)
+REPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'csv.gz': ('application/gzip', 'csv.gz'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def report_bounds(time_range):
+    """(from ms, to ms) for range=today|week|all; None leaves that side open."""
+    if time_range == 'today':
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return db.to_ms(today), db.to_ms(today + timedelta(days=1))
+    if time_range == 'week':
+        return db.now_ms() - 7 * 24 * 3600 * 1000, None
+    return None, None  # all data
+
+
+def report_query(from_ms=None, to_ms=None, max_id=None, columns=', '.join(REPORT_COLUMNS)):
+    """SQL and parameters selecting the report rows, newest first; max_id pins the rows to an ingest watermark."""
+    clauses, params = [], []
+    if from_ms is not None:
+        clauses.append('timestamp >= ?')
+        params.append(from_ms)
+    if to_ms is not None:
+        clauses.append('timestamp < ?')
+        params.append(to_ms)
+    if max_id is not None:
+        clauses.append('id <= ?')
+        params.append(max_id)
+    sql = f'SELECT {columns} FROM sensor_readings'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    if columns != 'COUNT(*)':
+        sql += ' ORDER BY timestamp DESC'
+    return sql, params
+
+
+def batches(first, cursor, size=REPORT_BATCH_ROWS):
+    yield first
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield rows
+
+
+def csv_chunk(rows):
+    """CSV lines for a batch of rows, as one string."""
+    lines = []
+    for row in rows:
+        timestamp = db.format_ms(row[0])
+        fire_status = "FIRE DETECTED" if row[1] else "SAFE"
+        temperature = row[2] if row[2] is not None else 0
+        smoke = row[3] if row[3] is not None else 0
+        co = row[4] if row[4] is not None else 0
+        lpg = row[5] if row[5] is not None else 0
+        gas_value = row[6] if row[6] is not None else 0
+        pressure = row[7] if row[7] is not None else 0
+        aqi = row[8] if row[8] is not None else 0
+
+        lines.append(f"{timestamp},{fire_status},{temperature:.2f},{smoke:.2f},{co:.2f},{lpg:.2f},{gas_value},{pressure:.2f},{aqi}\n")
+    return "".join(lines)
+
+
+def csv_chunks(first, cursor):
+    yield REPORT_HEADER
+    for rows in batches(first, cursor):
+        yield csv_chunk(rows)
+
+
+def gzip_chunks(first, cursor):
+    """The CSV report as one gzip stream, compressed a batch at a time."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in csv_chunks(first, cursor):
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def ndjson_chunks(first, cursor):
+    """One JSON object per reading with raw values: epoch ms, 0/1 fire flag, NULLs kept."""
+    for rows in batches(first, cursor):
+        yield "".join(json.dumps({'timestamp': row[0], 'fire': int(bool(row[1])), 'temperature': row[2],
+                                  'smoke': row[3], 'co': row[4], 'lpg': row[5], 'gas_value': row[6],
+                                  'pressure': row[7], 'aqi': row[8]}, separators=(',', ':')) + "\n"
+                      for row in rows)
+
+
+class _ChunkSink:
+    """Write-only file object that hands whatever ParquetWriter wrote so far back to the generator."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parquet_chunks(first, cursor):
+    """Parquet file written one row group per PARQUET_ROW_GROUP_ROWS rows (needs pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Measurements are REAL/INTEGER in SQLite but can hold either; float64 keeps one schema for every group
+    schema = pa.schema([('timestamp', pa.timestamp('ms', tz='UTC')), ('fire', pa.bool_())] +
+                       [(name, pa.float64()) for name in REPORT_COLUMNS[2:]])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        rows = first + cursor.fetchmany(PARQUET_ROW_GROUP_ROWS - len(first))
+        while rows:
+            columns = list(zip(*rows))
+            arrays = [pa.array(columns[0], type=pa.int64()).cast(schema.field('timestamp').type),
+                      pa.array([None if v is None else bool(v) for v in columns[1]], type=pa.bool_())]
+            arrays += [pa.array(column, type=pa.float64()) for column in columns[2:]]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+            rows = cursor.fetchmany(PARQUET_ROW_GROUP_ROWS)
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {
+    'csv': csv_chunks,
+    'csv.gz': gzip_chunks,
+    'ndjson': ndjson_chunks,
+    'parquet': parquet_chunks,
+}
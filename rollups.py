@@ -0,0 +1,300 @@
+"""Per-minute, per-hour and per-day rollups of sensor_readings.
+
+Each rollup table has one row per UTC-aligned bucket with the reading
+count, fire count and, for every metric, count/min/max/sum/last of its
+non-NULL numeric values. apply() folds newly inserted readings in, in the
+same transaction as the INSERT; backfill() rebuilds the minutes from raw
+rows and each coarser table from the one below it. summarize() answers a
+range from the coarsest buckets that fit and reads raw rows only for the
+sub-minute edges, and envelope() gives the long-range downsampled history
+of GET /update?points=N. Run this module to rebuild the rollups of sensor_data.db:
+
+    python rollups.py
+"""
+import math
+import time
+
+METRICS = ('temperature', 'smoke', 'co', 'lpg', 'gas_value', 'pressure', 'aqi')
+
+# Table suffix and bucket width in ms, finest first
+ROLLUPS = (('1m', 60_000), ('1h', 3_600_000), ('1d', 86_400_000))
+
+# Accumulator layout: [count, fire_count, last_ts] + [n, min, max, sum, last] per metric
+_FIELDS = 5
+_BASE = 3
+
+
+def table(suffix):
+    return f"sensor_rollup_{suffix}"
+
+
+def _columns():
+    columns = ['bucket', 'count', 'fire_count', 'last_ts']
+    for metric in METRICS:
+        columns += [f"{metric}_count", f"{metric}_min", f"{metric}_max", f"{metric}_sum", f"{metric}_last"]
+    return columns
+
+
+COLUMNS = _columns()
+
+
+def create_tables(conn):
+    for suffix, _ in ROLLUPS:
+        metric_columns = ",\n".join(f"{m}_count INTEGER NOT NULL DEFAULT 0, {m}_min REAL, {m}_max REAL, "
+                                    f"{m}_sum REAL NOT NULL DEFAULT 0, {m}_last REAL" for m in METRICS)
+        conn.execute(f'''CREATE TABLE IF NOT EXISTS {table(suffix)}
+                         (bucket INTEGER PRIMARY KEY,
+                          count INTEGER NOT NULL,
+                          fire_count INTEGER NOT NULL,
+                          last_ts INTEGER NOT NULL,
+                          {metric_columns})''')
+
+
+def _upsert_sql(name):
+    updates = ["count = count + excluded.count",
+               "fire_count = fire_count + excluded.fire_count",
+               "last_ts = max(last_ts, excluded.last_ts)"]
+    for m in METRICS:
+        updates += [f"{m}_count = {m}_count + excluded.{m}_count",
+                    f"{m}_min = CASE WHEN {m}_min IS NULL OR excluded.{m}_min < {m}_min "
+                    f"THEN coalesce(excluded.{m}_min, {m}_min) ELSE {m}_min END",
+                    f"{m}_max = CASE WHEN {m}_max IS NULL OR excluded.{m}_max > {m}_max "
+                    f"THEN coalesce(excluded.{m}_max, {m}_max) ELSE {m}_max END",
+                    f"{m}_sum = {m}_sum + excluded.{m}_sum",
+                    # SET expressions see the old row, so this compares against the old last_ts
+                    f"{m}_last = CASE WHEN excluded.last_ts >= last_ts THEN excluded.{m}_last ELSE {m}_last END"]
+    return (f"INSERT INTO {name} ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+            f"ON CONFLICT(bucket) DO UPDATE SET {', '.join(updates)}")
+
+
+_UPSERT = {suffix: _upsert_sql(table(suffix)) for suffix, _ in ROLLUPS}
+
+
+def _number(value):
+    # Mirrors what SQLite keeps numeric: non-numeric text does not count as a value
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _new_accumulator(timestamp):
+    return [0, 0, timestamp] + [0, None, None, 0.0, None] * len(METRICS)
+
+
+def _add(acc, timestamp, fire, values):
+    acc[0] += 1
+    acc[1] += 1 if _number(fire) else 0
+    newer = timestamp >= acc[2]
+    if newer:
+        acc[2] = timestamp
+    for i, value in enumerate(values):
+        base = _BASE + _FIELDS * i
+        if value is not None:
+            acc[base] += 1
+            if acc[base + 1] is None or value < acc[base + 1]:
+                acc[base + 1] = value
+            if acc[base + 2] is None or value > acc[base + 2]:
+                acc[base + 2] = value
+            acc[base + 3] += value
+        if newer:
+            acc[base + 4] = value
+
+
+def _merge(acc, other):
+    """Fold accumulator `other` (a rollup row without its bucket) into `acc`."""
+    acc[0] += other[0]
+    acc[1] += other[1]
+    newer = other[2] >= acc[2]
+    if newer:
+        acc[2] = other[2]
+    for i in range(len(METRICS)):
+        base = _BASE + _FIELDS * i
+        acc[base] += other[base]
+        for offset, better in ((1, lambda a, b: a < b), (2, lambda a, b: a > b)):
+            value = other[base + offset]
+            if value is not None and (acc[base + offset] is None or better(value, acc[base + offset])):
+                acc[base + offset] = value
+        acc[base + 3] += other[base + 3]
+        if newer:
+            acc[base + 4] = other[base + 4]
+
+
+def apply(conn, rows):
+    """Fold inserted readings into every rollup table; rows use the ingest INSERT order:
+    (timestamp ms, fire, temperature, smoke, co, lpg, gas_value, pressure, aqi)."""
+    parsed = [(row[0], row[1], [_number(value) for value in row[2:]]) for row in rows]
+    for suffix, width in ROLLUPS:
+        buckets = {}
+        for timestamp, fire, values in parsed:
+            bucket = timestamp - timestamp % width
+            acc = buckets.get(bucket)
+            if acc is None:
+                acc = buckets[bucket] = _new_accumulator(timestamp)
+            _add(acc, timestamp, fire, values)
+        conn.executemany(_UPSERT[suffix], [[bucket] + acc for bucket, acc in buckets.items()])
+
+
+def backfill(conn, from_ms=None):
+    """Rebuild the rollups from sensor_readings (only buckets from `from_ms` on, if given).
+
+    Call inside a transaction that blocks writers (BEGIN IMMEDIATE), or
+    readings inserted meanwhile may be counted twice or not at all.
+    """
+    # Minutes come from the raw rows; only numeric values count, as in apply(). rn = 1 marks the
+    # newest reading of each bucket
+    numeric = ", ".join(f"CASE WHEN typeof({m}) IN ('integer', 'real') THEN {m} END AS {m}" for m in METRICS)
+    aggregates = ", ".join(f"COUNT({m}), MIN({m}), MAX({m}), TOTAL({m}), MAX(CASE WHEN rn = 1 THEN {m} END)"
+                           for m in METRICS)
+    source = f'''SELECT bucket, COUNT(*), SUM(CASE WHEN CAST(fire AS REAL) != 0 THEN 1 ELSE 0 END),
+                         MAX(timestamp), {aggregates}
+                  FROM (SELECT timestamp - timestamp % {{width}} AS bucket, timestamp, fire, {numeric},
+                               row_number() OVER (PARTITION BY timestamp - timestamp % {{width}}
+                                                  ORDER BY timestamp DESC, id DESC) AS rn
+                        FROM sensor_readings WHERE timestamp >= ?)
+                  GROUP BY bucket'''
+    # Hours and days are folded from the next finer rollup, which is much smaller than the raw table
+    merged = ", ".join(f"SUM({m}_count), MIN({m}_min), MAX({m}_max), TOTAL({m}_sum), "
+                       f"MAX(CASE WHEN rn = 1 THEN {m}_last END)" for m in METRICS)
+    for level, (suffix, width) in enumerate(ROLLUPS):
+        name = table(suffix)
+        start = -2 ** 63 if from_ms is None else from_ms - from_ms % width
+        conn.execute(f"DELETE FROM {name} WHERE bucket >= ?", (start,))
+        if level > 0:
+            source = f'''SELECT coarse, SUM(count), SUM(fire_count), MAX(last_ts), {merged}
+                          FROM (SELECT *, bucket - bucket % {{width}} AS coarse,
+                                       row_number() OVER (PARTITION BY bucket - bucket % {{width}}
+                                                          ORDER BY last_ts DESC) AS rn
+                                FROM {table(ROLLUPS[level - 1][0])} WHERE bucket >= ?)
+                          GROUP BY coarse'''
+        conn.execute(f"INSERT INTO {name} ({', '.join(COLUMNS)}) " + source.format(width=width), (start,))
+
+
+def segments(from_ms, to_ms, levels=ROLLUPS):
+    """Split [from_ms, to_ms) into (suffix, start, end) pieces, coarsest rollup first.
+
+    `levels` are the usable (suffix, width) rollups, finest first. Each
+    piece is whole buckets of that rollup; suffix None marks an edge too
+    short for any of them, to be read from sensor_readings.
+    """
+    pieces = []
+
+    def cover(start, end, level):
+        if start >= end:
+            return
+        if level < 0:
+            pieces.append((None, start, end))
+            return
+        suffix, width = levels[level]
+        inner_start = -(-start // width) * width
+        inner_end = end - end % width
+        if inner_start >= inner_end:
+            cover(start, end, level - 1)
+            return
+        pieces.append((suffix, inner_start, inner_end))
+        cover(start, inner_start, level - 1)
+        cover(inner_end, end, level - 1)
+
+    cover(from_ms, to_ms, len(levels) - 1)
+    return pieces
+
+
+def summarize(conn, from_ms, to_ms):
+    """Exact reading count, fire count and per-metric count/min/max/avg/last for [from_ms, to_ms).
+
+    The range is covered by whole days, then hours, then minutes; only the
+    sub-minute edges are read from sensor_readings.
+    """
+    acc = _new_accumulator(-1)
+    stats = {"rollup_rows": 0, "raw_rows": 0}
+
+    for suffix, start, end in segments(from_ms, to_ms):
+        if suffix is None:
+            rows = conn.execute(f'''SELECT timestamp, fire, {', '.join(METRICS)} FROM sensor_readings
+                                    WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp, id''',
+                                (start, end)).fetchall()
+            stats["raw_rows"] += len(rows)
+            for row in rows:
+                _add(acc, row[0], row[1], [_number(value) for value in row[2:]])
+            continue
+        rows = conn.execute(f'''SELECT {', '.join(COLUMNS[1:])} FROM {table(suffix)}
+                                WHERE bucket >= ? AND bucket < ? ORDER BY bucket''',
+                            (start, end)).fetchall()
+        stats["rollup_rows"] += len(rows)
+        for row in rows:
+            _merge(acc, list(row))
+
+    metrics = {}
+    for i, metric in enumerate(METRICS):
+        base = _BASE + _FIELDS * i
+        count = acc[base]
+        metrics[metric] = {"count": count, "min": acc[base + 1], "max": acc[base + 2],
+                           "avg": acc[base + 3] / count if count else None, "last": acc[base + 4]}
+    return {"from": from_ms, "to": to_ms, "count": acc[0], "fire_count": acc[1],
+            "last_timestamp": acc[2] if acc[0] else None, "metrics": metrics, "source": stats}
+
+
+def envelope(conn, from_ms, points):
+    """History rows from `from_ms` on as a min/max envelope of at most `points` rows; None if too fine.
+
+    The readings since `from_ms` are split into under points // 2 equal
+    buckets, widened to whole minutes or hours and read from that rollup: each
+    bucket gives a row of every metric's minimum at the bucket start and a
+    row of its maximum at its newest reading, so spikes survive. Rows have
+    the history shape (timestamp, fire, temperature, ..., aqi). Returns None
+    when a bucket would be shorter than a minute; the caller should then
+    downsample raw rows instead. Buckets only partly after `from_ms` are
+    left out.
+    """
+    if points < 4:
+        return None
+    first, last = conn.execute('''SELECT MIN(timestamp), MAX(timestamp) FROM sensor_readings
+                                  WHERE timestamp >= ?''', (from_ms,)).fetchone()
+    if first is None:
+        return None
+    # One bucket fewer than fits, as epoch-aligned buckets may straddle both ends of the span
+    width = -(-(last - first) // (points // 2 - 1))
+    if width < ROLLUPS[0][1]:
+        return None
+    suffix, unit = ROLLUPS[0] if width < ROLLUPS[1][1] else ROLLUPS[1]
+    width = -(-width // unit) * unit
+    start = -(-from_ms // unit) * unit
+
+    lows = ", ".join(f"MIN({m}_min)" for m in METRICS)
+    highs = ", ".join(f"MAX({m}_max)" for m in METRICS)
+    rows = []
+    for bucket, last_ts, fire_count, *values in conn.execute(
+            f'''SELECT MIN(bucket), MAX(last_ts), SUM(fire_count), {lows}, {highs}
+                FROM {table(suffix)} WHERE bucket >= ?
+                GROUP BY bucket - bucket % ? ORDER BY 1''', (start, width)):
+        fire = 1 if fire_count else 0
+        if last_ts > bucket:
+            rows.append((bucket, fire, *values[:len(METRICS)]))
+        rows.append((last_ts, fire, *values[len(METRICS):]))
+    return rows
+
+
+def main():
+    import db
+
+    db.migrate()
+    conn = db.get_connection()
+    start = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        backfill(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    counts = {suffix: conn.execute(f"SELECT COUNT(*) FROM {table(suffix)}").fetchone()[0] for suffix, _ in ROLLUPS}
+    print(f"Rebuilt rollups in {time.perf_counter() - start:.2f}s: "
+          + ", ".join(f"{suffix} {count} buckets" for suffix, count in counts.items()))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
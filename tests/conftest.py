@@ -0,0 +1,18 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import db  # noqa: E402
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """A migrated scratch database, separate from sensor_data.db."""
+    conn = sqlite3.connect(tmp_path / "sensor_data.db", factory=db.TimedConnection)
+    db.migrate(conn)
+    yield conn
+    conn.close()
@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pytest
+
+import aggregates
+import ingest
+import rollups
+
+START = 1_700_000_000_000
+DAY_MS = 24 * 3600 * 1000
+
+
+@pytest.fixture
+def filled(conn):
+    rng = random.Random(7)
+    rows = []
+    for i in range(20000):
+        smoke = rng.choice([None, 'abc', rng.randint(0, 900), rng.uniform(0, 900)])
+        rows.append((START + rng.randrange(3 * DAY_MS), i % 50 == 0, rng.uniform(15, 45), smoke,
+                     1.5, 2.0, rng.randint(0, 1000), 1013.2, rng.randint(0, 300)))
+    conn.executemany(ingest.INSERT_SQL, rows)
+    rollups.apply(conn, rows)
+    conn.commit()
+    return conn
+
+
+def test_parse_bucket():
+    assert aggregates.parse_bucket('30s') == 30_000
+    assert aggregates.parse_bucket('5m') == 300_000
+    assert aggregates.parse_bucket('1h') == 3_600_000
+    assert aggregates.parse_bucket('1d') == DAY_MS
+    assert aggregates.parse_bucket('90') == 90_000
+    for value in (None, '', '0', '0m', '-1h', '1w', '1.5h'):
+        assert aggregates.parse_bucket(value) is None
+
+
+def test_metric_column():
+    assert aggregates.metric_column('temp') == 'temperature'
+    assert aggregates.metric_column('gasValue') == 'gas_value'
+    assert aggregates.metric_column('smoke') == 'smoke'
+    assert aggregates.metric_column('timestamp') is None
+
+
+@pytest.mark.parametrize("bucket", ['30s', '5m', '1h', '1d', '7m'])
+@pytest.mark.parametrize("fn", ['avg', 'min', 'max'])
+def test_rollups_match_raw_rows(filled, bucket, fn):
+    bucket_ms = aggregates.parse_bucket(bucket)
+    # Unaligned bounds, so the edges come from sensor_readings
+    from_ms, to_ms = START + 12345, START + 3 * DAY_MS - 6789
+    result = aggregates.aggregate(filled, 'smoke', bucket_ms, from_ms, to_ms, fn)
+    raw = aggregates.aggregate(filled, 'smoke', bucket_ms, from_ms, to_ms, fn, use_rollups=False)
+    assert raw["source"] == {'sensor_readings': 1}
+    assert result["timestamps"] == raw["timestamps"]
+    assert result["counts"] == raw["counts"]
+    assert result["values"] == pytest.approx(raw["values"])
+    if bucket_ms % 60_000 == 0:
+        assert any(source.startswith('sensor_rollup_') for source in result["source"])
+
+
+@pytest.mark.parametrize("batch_rows", [aggregates.P95_BATCH_ROWS, 100, 1])
+def test_p95_is_nearest_rank(filled, monkeypatch, batch_rows):
+    monkeypatch.setattr(aggregates, 'P95_BATCH_ROWS', batch_rows)
+    bucket_ms = aggregates.parse_bucket('1h')
+    from_ms, to_ms = START, START + 3 * DAY_MS
+    result = aggregates.aggregate(filled, 'smoke', bucket_ms, from_ms, to_ms, 'p95')
+
+    expected = {}
+    for timestamp, value in filled.execute('''SELECT timestamp, smoke FROM sensor_readings
+                                              WHERE typeof(smoke) IN ('integer', 'real')'''):
+        expected.setdefault(timestamp - timestamp % bucket_ms, []).append(value)
+    assert result["timestamps"] == sorted(expected)
+    assert result["counts"] == [len(expected[b]) for b in sorted(expected)]
+    assert result["values"] == [np.percentile(expected[b], 95, method='inverted_cdf') for b in sorted(expected)]
+
+
+def test_p95_small_buckets():
+    # ceil(0.95 * n)-th smallest: the maximum below 20 values, the 19th of 20
+    buckets = np.array([0, 0, 0] + [10] * 20, dtype=float)
+    values = np.array([3, 1, 2] + list(range(20, 0, -1)), dtype=float)
+    assert aggregates._nearest_rank(buckets, values) == ([0, 10], [3.0, 19.0], [3, 20])
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from history import HISTORY_METRICS, downsample_history_columnar, downsample_history_rows
+
+
+def history(count, seed=5):
+    rng = random.Random(seed)
+    return [(i * 1000, 0, *(rng.uniform(0, 100) for _ in range(7))) for i in range(count)]
+
+
+@pytest.mark.parametrize("points", [3, 7, 8, 9, 100, 500, 5000])
+def test_columnar_downsample_shares_at_most_points_rows(points):
+    rows = history(20000)
+    data = downsample_history_columnar(rows, points)
+    assert 2 <= len(data["timestamps"]) <= points
+    assert data["timestamps"] == sorted(data["timestamps"])
+    assert data["timestamps"][0] == rows[0][0] and data["timestamps"][-1] == rows[-1][0]
+    for key, _ in HISTORY_METRICS:
+        assert len(data[key]) == len(data["timestamps"])
+
+
+def test_short_history_is_returned_whole():
+    rows = history(5)
+    assert downsample_history_columnar(rows, 500)["timestamps"] == [row[0] for row in rows]
+    assert downsample_history_columnar([], 500)["timestamps"] == []
+
+
+def test_row_downsample_bounds_each_metric():
+    data = downsample_history_rows(history(20000), 100)
+    for key, _ in HISTORY_METRICS:
+        assert len(data[key]) == 100
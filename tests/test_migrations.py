@@ -0,0 +1,45 @@
+import sqlite3
+
+import db
+import rollups
+
+ROWS = [
+    ("2024-01-01 00:00:00", 0, 21.5, 120.0, 1.5, 2.0, 300, 1013.2, 40),
+    ("2024-01-01 00:00:05", 1, 48.0, 880.0, 9.0, 4.5, 950, 1009.8, 210),
+    ("2024-01-01 00:01:10", 0, None, 'abc', 1.0, 2.0, 310, 1013.0, 42),
+]
+
+
+def test_schema_v1_rows_survive_later_migrations(tmp_path):
+    conn = sqlite3.connect(tmp_path / "sensor_data.db", factory=db.TimedConnection)
+    db.MIGRATIONS[0](conn)
+    conn.executemany('''INSERT INTO sensor_readings
+                        (timestamp, fire, temperature, smoke, co, lpg, gas_value, pressure, aqi)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', ROWS)
+    conn.execute("CREATE TABLE schema_version (version INTEGER NOT NULL)")
+    conn.execute("INSERT INTO schema_version (version) VALUES (1)")
+    conn.commit()
+
+    assert db.migrate(conn) == len(db.MIGRATIONS)
+    assert db.schema_version(conn) == len(db.MIGRATIONS)
+
+    rows = conn.execute('''SELECT id, timestamp, fire, temperature, smoke, co, lpg, gas_value, pressure, aqi
+                           FROM sensor_readings ORDER BY id''').fetchall()
+    assert [row[0] for row in rows] == [1, 2, 3]
+    # DATETIME text became integer epoch milliseconds (UTC)
+    assert [row[1] for row in rows] == [1704067200000, 1704067205000, 1704067270000]
+    assert [row[2:] for row in rows] == [row[1:] for row in ROWS]
+    assert conn.execute('''SELECT name FROM sqlite_master
+                           WHERE name = 'idx_sensor_readings_timestamp' ''').fetchone()
+
+    # Migration 4 built the rollups from the migrated rows
+    count, fire_count, smoke_count = conn.execute(f'''SELECT SUM(count), SUM(fire_count), SUM(smoke_count)
+                                                      FROM {rollups.table('1m')}''').fetchone()
+    assert (count, fire_count, smoke_count) == (3, 1, 2)
+
+
+def test_migrate_is_idempotent(conn):
+    conn.execute("INSERT INTO sensor_readings (timestamp, temperature) VALUES (1000, 20.0)")
+    conn.commit()
+    db.migrate(conn)
+    assert conn.execute("SELECT id, timestamp, temperature FROM sensor_readings").fetchall() == [(1, 1000, 20.0)]
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+import ingest
+import rollups
+
+START = 1_700_000_000_000
+
+
+def readings(count, seed=1):
+    """Random readings over about two days, including NULLs and non-numeric text."""
+    rng = random.Random(seed)
+    values = lambda: rng.choice([None, 'abc', rng.randint(0, 900), rng.uniform(-5, 60)])  # noqa: E731
+    rows = []
+    for _ in range(count):
+        timestamp = START + rng.randrange(2 * 24 * 3600 * 1000)
+        rows.append((timestamp, rng.choice([0, 1, None]), *(values() for _ in rollups.METRICS)))
+    return rows
+
+
+def dump(conn):
+    tables = {}
+    for suffix, _ in rollups.ROLLUPS:
+        rows = conn.execute(f"SELECT {', '.join(rollups.COLUMNS)} FROM {rollups.table(suffix)} ORDER BY bucket")
+        tables[suffix] = [tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows]
+    return tables
+
+
+def test_apply_matches_backfill(conn):
+    rows = readings(3000)
+    # Folded in as several ingest batches, as the writer would
+    for i in range(0, len(rows), 250):
+        batch = rows[i:i + 250]
+        conn.executemany(ingest.INSERT_SQL, batch)
+        rollups.apply(conn, batch)
+    conn.commit()
+    applied = dump(conn)
+
+    conn.execute("BEGIN IMMEDIATE")
+    rollups.backfill(conn)
+    conn.commit()
+    assert dump(conn) == applied
+    assert sum(row[1] for row in applied['1d']) == len(rows)
+
+
+def test_partial_backfill_keeps_older_buckets(conn):
+    rows = readings(1000, seed=2)
+    conn.executemany(ingest.INSERT_SQL, rows)
+    rollups.apply(conn, rows)
+    conn.commit()
+    before = dump(conn)
+
+    conn.execute("BEGIN IMMEDIATE")
+    rollups.backfill(conn, from_ms=START + 36 * 3600 * 1000 + 12345)
+    conn.commit()
+    assert dump(conn) == before
+
+
+@pytest.mark.parametrize("from_ms,to_ms", [
+    (START, START + 2 * 24 * 3600 * 1000),
+    (START + 12345, START + 30 * 3600 * 1000 + 678),
+    (START + 61_000, START + 119_000),
+])
+def test_summarize_matches_raw_rows(conn, from_ms, to_ms):
+    rows = readings(3000, seed=3)
+    conn.executemany(ingest.INSERT_SQL, rows)
+    rollups.apply(conn, rows)
+    conn.commit()
+
+    summary = rollups.summarize(conn, from_ms, to_ms)
+    count, = conn.execute("SELECT COUNT(*) FROM sensor_readings WHERE timestamp >= ? AND timestamp < ?",
+                          (from_ms, to_ms)).fetchone()
+    assert summary["count"] == count
+    for metric in rollups.METRICS:
+        expected = conn.execute(f'''SELECT COUNT(v), MIN(v), MAX(v), AVG(v)
+                                    FROM (SELECT CASE WHEN typeof({metric}) IN ('integer', 'real')
+                                                      THEN {metric} END AS v
+                                          FROM sensor_readings WHERE timestamp >= ? AND timestamp < ?)''',
+                                (from_ms, to_ms)).fetchone()
+        stats = summary["metrics"][metric]
+        assert stats["count"] == expected[0]
+        assert stats["min"] == expected[1]
+        assert stats["max"] == expected[2]
+        assert stats["avg"] == pytest.approx(expected[3])
+
+
+def test_envelope_keeps_extremes(conn):
+    rows = [(START + i * 30_000, 0, 20.0, float(i % 100), 1.0, 2.0, 3.0, 4.0, 5.0) for i in range(20000)]
+    rows[777] = (rows[777][0], 1, 99.0, *rows[777][3:])
+    conn.executemany(ingest.INSERT_SQL, rows)
+    rollups.apply(conn, rows)
+    conn.commit()
+
+    envelope = rollups.envelope(conn, START, 200)
+    assert len(envelope) <= 200
+    assert [row[0] for row in envelope] == sorted(row[0] for row in envelope)
+    assert max(row[2] for row in envelope) == 99.0
+    assert any(row[1] for row in envelope)
+    assert {row[3] for row in envelope} == {0.0, 99.0}
+    # Too fine for the minute rollup: the caller downsamples raw rows instead
+    assert rollups.envelope(conn, START + 19990 * 30_000, 200) is None